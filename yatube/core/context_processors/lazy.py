@@ -0,0 +1,10 @@
+from django.utils.functional import SimpleLazyObject
+
+
+def request_lazy(request, name, factory):
+    """Значение вычисляется при первом обращении из шаблона и
+    запоминается на время запроса."""
+    values = request.__dict__.setdefault('_context_values', {})
+    if name not in values:
+        values[name] = SimpleLazyObject(factory)
+    return values[name]
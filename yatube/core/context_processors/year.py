@@ -1,10 +1,13 @@
-import datetime
+from django.utils import timezone
 
-
-now = datetime.datetime.now()
+from .lazy import request_lazy
 
 
 def year(request):
     return {
-        'year': now.year
+        'year': request_lazy(
+            request,
+            'year',
+            lambda: timezone.localdate().year
+        )
     }
@@ -0,0 +1,130 @@
+import threading
+from collections import defaultdict, deque
+from time import perf_counter
+
+from django.conf import settings
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    __slots__ = (
+        'started', 'total', 'sql_count', 'sql_time', 'template_time',
+        'cache_hits', 'cache_misses',
+    )
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.total = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += perf_counter() - started
+            self.sql_count += 1
+
+    def finish(self):
+        self.total = perf_counter() - self.started
+
+    def server_timing(self):
+        return (
+            f'app;dur={self.total * 1000:.2f}, '
+            f'db;dur={self.sql_time * 1000:.2f};'
+            f'desc="{self.sql_count} queries", '
+            f'tpl;dur={self.template_time * 1000:.2f}, '
+            f'cache;desc="hits={self.cache_hits} misses={self.cache_misses}"'
+        )
+
+
+class RollingHistogram:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(
+            lambda: deque(maxlen=settings.REQUEST_METRICS_WINDOW)
+        )
+
+    def add(self, view_name, metrics):
+        sample = (
+            metrics.total,
+            metrics.sql_count,
+            metrics.sql_time,
+            metrics.template_time,
+            metrics.cache_hits,
+            metrics.cache_misses,
+        )
+        with self.lock:
+            self.samples[view_name].append(sample)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+    def snapshot(self):
+        with self.lock:
+            samples = {name: list(rows) for name, rows in self.samples.items()}
+        return {
+            name: summarize(rows) for name, rows in sorted(samples.items())
+        }
+
+
+def percentile(ordered, percent):
+    index = max(0, int(round(percent / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+def summarize(rows):
+    totals, sql_counts, sql_times, template_times, hits, misses = zip(*rows)
+    ordered = sorted(totals)
+    return {
+        'requests': len(rows),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'sql_queries_avg': round(sum(sql_counts) / len(rows), 2),
+        'sql_ms_avg': round(sum(sql_times) / len(rows) * 1000, 3),
+        'template_ms_avg': round(sum(template_times) / len(rows) * 1000, 3),
+        'cache_hits': sum(hits),
+        'cache_misses': sum(misses),
+    }
+
+
+histogram = RollingHistogram()
+
+
+def start():
+    _local.metrics = RequestMetrics()
+    return _local.metrics
+
+
+def stop():
+    metrics = getattr(_local, 'metrics', None)
+    _local.metrics = None
+    return metrics
+
+
+def current():
+    return getattr(_local, 'metrics', None)
+
+
+def record_template(duration):
+    metrics = current()
+    if metrics is not None:
+        metrics.template_time += duration
+
+
+def record_cache(hit):
+    metrics = current()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
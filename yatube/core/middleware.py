@@ -0,0 +1,30 @@
+from contextlib import ExitStack
+
+from django.db import connections
+
+from . import metrics
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(request_metrics.sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.stop()
+        request_metrics.finish()
+        match = request.resolver_match
+        metrics.histogram.add(
+            match.view_name if match else 'unresolved',
+            request_metrics
+        )
+        response['Server-Timing'] = request_metrics.server_timing()
+        return response
@@ -0,0 +1,57 @@
+import logging
+import os
+from time import perf_counter
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        started = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.record_template(perf_counter() - started)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def template_names(engine):
+    for directory in engine.dirs:
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.endswith('.html'):
+                    path = os.path.relpath(os.path.join(root, name), directory)
+                    yield path.replace(os.sep, '/')
+
+
+def warm_templates():
+    """Компилирует все шаблоны из DIRS, чтобы cached loader не разбирал
+    их на первых запросах."""
+    compiled = 0
+    for backend in engines.all():
+        engine = getattr(backend, 'engine', None)
+        if engine is None:
+            continue
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                logger.exception('Не удалось скомпилировать шаблон %s', name)
+                continue
+            compiled += 1
+    return compiled
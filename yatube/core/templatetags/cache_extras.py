@@ -0,0 +1,67 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from core import metrics
+
+register = template.Library()
+
+
+class VersionedCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, version, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.version = version
+        self.vary_on = vary_on
+
+    def render(self, context):
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        stale_key = make_template_fragment_key(self.fragment_name, vary_on)
+        key = f'{stale_key}.{self.version.resolve(context)}'
+        content = cache.get(key)
+        metrics.record_cache(content is not None)
+        if content is not None:
+            return content
+        lock_key = f'{stale_key}.lock'
+        if not cache.add(lock_key, True, settings.FRAGMENT_CACHE_LOCK_TIMEOUT):
+            content = cache.get(stale_key)
+            if content is not None:
+                request = context.get('request')
+                if request is not None:
+                    request._stale_fragment = True
+                return content
+            return self.nodelist.render(context)
+        try:
+            content = self.nodelist.render(context)
+            timeout = settings.FRAGMENT_CACHE_TIMEOUT
+            cache.set(key, content, timeout)
+            cache.set(stale_key, content, timeout * 2)
+        finally:
+            cache.delete(lock_key)
+        return content
+
+
+@register.tag('versioned_cache')
+def do_versioned_cache(parser, token):
+    """
+    Кэширует фрагмент до смены версии, а при промахе даёт перестроить
+    его только одному запросу; остальные получают прошлую копию, а запрос
+    помечается request._stale_fragment, чтобы страницу не кэшировали.
+
+        {% versioned_cache index_page cache_version request.GET.page %}
+    """
+    nodelist = parser.parse(('endversioned_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f'{tokens[0]!r} tag requires at least 2 arguments.'
+        )
+    fragment_name = tokens[1].strip('\'"')
+    return VersionedCacheNode(
+        nodelist,
+        fragment_name,
+        parser.compile_filter(tokens[2]),
+        [parser.compile_filter(token) for token in tokens[3:]],
+    )
@@ -0,0 +1,32 @@
+from django import template
+
+register = template.Library()
+
+ELLIPSIS = '…'
+
+
+def elided_page_range(paginator, number, on_each_side=2, on_ends=1):
+    number = paginator.validate_number(number)
+    if paginator.num_pages <= (on_each_side + on_ends) * 2:
+        yield from paginator.page_range
+        return
+    if number > 1 + on_each_side + on_ends + 1:
+        yield from range(1, on_ends + 1)
+        yield ELLIPSIS
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < paginator.num_pages - on_each_side - on_ends - 1:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield ELLIPSIS
+        yield from range(
+            paginator.num_pages - on_ends + 1,
+            paginator.num_pages + 1
+        )
+    else:
+        yield from range(number + 1, paginator.num_pages + 1)
+
+
+@register.filter
+def page_window(page_obj):
+    return elided_page_range(page_obj.paginator, page_obj.number)
@@ -0,0 +1,169 @@
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+from .caching import (
+    INDEX_SCOPE, get_last_modified, get_version, group_scope, profile_scope
+)
+from .conditional import make_etag, post_state
+from .models import Group, Post, User
+from .paginators import CursorPaginator
+from .thumbnails import thumbnail_url
+from .utils import CURSOR_PARAM, ORDER_PARAM, paginate_comments
+from yatube.settings import POSTS_ON_PAGE
+
+
+def serialize_post(post):
+    return {
+        'id': post.pk,
+        'text': post.text,
+        'created': post.created.isoformat(),
+        'author': {
+            'username': post.author.username,
+            'full_name': post.author.get_full_name(),
+        },
+        'group': post.group and {
+            'slug': post.group.slug,
+            'title': post.group.title,
+        },
+        'image': post.image.url if post.image else None,
+        'thumbnail': thumbnail_url(post.image.name) if post.image else None,
+    }
+
+
+def serialize_comment(comment):
+    return {
+        'id': comment.pk,
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+        'author': comment.author.username,
+    }
+
+
+def page_url(request, cursor, **params):
+    if cursor is None:
+        return None
+    query = ''.join(f'{name}={value}&' for name, value in params.items())
+    return f'{request.path}?{query}{CURSOR_PARAM}={cursor}'
+
+
+def conditional_response(request, state, last_modified, build):
+    etag = quote_etag(make_etag(request, state))
+    timestamp = last_modified and int(last_modified.timestamp())
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=timestamp,
+    )
+    if response is None:
+        response = JsonResponse(
+            build(),
+            json_dumps_params={'ensure_ascii': False}
+        )
+    response['ETag'] = etag
+    if timestamp:
+        response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+def feed_response(request, post_list, scope):
+    def build():
+        page_obj = CursorPaginator(post_list, POSTS_ON_PAGE).get_page(
+            request.GET.get(CURSOR_PARAM)
+        )
+        return {
+            'results': [serialize_post(post) for post in page_obj],
+            'next': page_url(request, page_obj.next_cursor),
+            'previous': page_url(request, page_obj.previous_cursor),
+        }
+
+    return conditional_response(
+        request,
+        get_version(scope),
+        get_last_modified(scope),
+        build
+    )
+
+
+@require_safe
+def index(request):
+    return feed_response(
+        request,
+        Post.objects.for_listing(),
+        INDEX_SCOPE
+    )
+
+
+@require_safe
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(
+        request,
+        group.groups.for_listing(),
+        group_scope(group.pk)
+    )
+
+
+@require_safe
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    return feed_response(
+        request,
+        author.posts.for_listing(),
+        profile_scope(author.pk)
+    )
+
+
+@require_safe
+def post_detail(request, post_id):
+    version, last_modified = post_state(request, post_id)
+    if version is None:
+        raise Http404
+
+    def build():
+        post = get_object_or_404(Post.objects.for_detail(), pk=post_id)
+        data = serialize_post(post)
+        data['comments_count'] = post.comments_count
+        comments, order = paginate_comments(request, post.comments)
+        data['comments'] = [
+            serialize_comment(comment) for comment in comments
+        ]
+        data['comments_next'] = page_url(
+            request,
+            comments.next_cursor,
+            **{ORDER_PARAM: order}
+        )
+        return data
+
+    return conditional_response(request, version, last_modified, build)
+
+
+@require_safe
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Требуется авторизация.'}, status=401)
+    entries = request.user.timeline.all()
+    timeline = entries.aggregate(last=Max('id'), total=Count('id'))
+    scopes = (INDEX_SCOPE, profile_scope(request.user.pk))
+    version = get_version(*scopes)
+
+    def build():
+        page_obj = CursorPaginator(
+            entries.select_related('post__author', 'post__group'),
+            POSTS_ON_PAGE
+        ).get_page(request.GET.get(CURSOR_PARAM))
+        return {
+            'results': [serialize_post(entry.post) for entry in page_obj],
+            'next': page_url(request, page_obj.next_cursor),
+            'previous': page_url(request, page_obj.previous_cursor),
+        }
+
+    return conditional_response(
+        request,
+        f'{version}:{timeline["last"]}:{timeline["total"]}',
+        get_last_modified(*scopes),
+        build
+    )
@@ -0,0 +1,384 @@
+import random
+import re
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.template import RequestContext, engines
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import counters, timeline
+from .models import Comment, Follow, Group, Post, User
+from .paginators import CursorPaginator
+from .utils import keep_created
+from core.template_backends import warm_templates
+from yatube.settings import POSTS_ON_PAGE
+
+BATCH_SIZE = 1000
+PERCENTILES = (50, 95, 99)
+PLAIN_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+TEMPLATE_LOADERS = {
+    'uncached': PLAIN_LOADERS,
+    'cached': [('django.template.loaders.cached.Loader', PLAIN_LOADERS)],
+}
+TEMPLATE_PAGES = (
+    'index', 'group_list', 'profile', 'post_detail', 'search', 'follow_index',
+)
+TEMPLATE_TIMING = re.compile(r'tpl;dur=([\d.]+)')
+CHROME_TEMPLATES = ('includes/header.html', 'includes/footer.html')
+SESSION_SETUPS = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': [
+            'django.contrib.auth.backends.ModelBackend',
+        ],
+    },
+    'cached': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'AUTHENTICATION_BACKENDS': [
+            'core.auth_backends.CachedModelBackend',
+        ],
+    },
+}
+SESSION_PAGES = (*TEMPLATE_PAGES, 'post_create', 'post_edit')
+USERNAME = 'bench_{}_{}'
+WORDS = (
+    'яндекс', 'практикум', 'django', 'python', 'пост', 'группа', 'кэш',
+    'индекс', 'лента', 'подписка', 'комментарий', 'картинка', 'поиск',
+    'запрос', 'страница', 'автор', 'новость', 'дневник', 'код', 'тест',
+)
+
+
+def power_law_weights(count, alpha, rng):
+    return [rng.paretovariate(alpha) for _ in range(count)]
+
+
+def random_text(rng, words=12):
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+def bulk_insert(model, objects):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def seed(users, groups, posts, comments, follows, alpha=1.5, seed=None):
+    rng = random.Random(seed)
+    run = int(time.time())
+    password = make_password(None)
+    bulk_insert(User, (
+        User(username=USERNAME.format(run, i), password=password)
+        for i in range(users)
+    ))
+    user_ids = list(
+        User.objects.filter(
+            username__startswith=USERNAME.format(run, '')
+        ).values_list('id', flat=True)
+    )
+    bulk_insert(Group, (
+        Group(
+            title=f'Группа {i}',
+            slug=USERNAME.format(run, i).replace('_', '-'),
+            description=random_text(rng)
+        )
+        for i in range(groups)
+    ))
+    group_ids = list(
+        Group.objects.filter(
+            slug__startswith=USERNAME.format(run, '').replace('_', '-')
+        ).values_list('id', flat=True)
+    )
+    now = timezone.now()
+    offsets = sorted(
+        (rng.randrange(365 * 24 * 60 * 60) for _ in range(posts)),
+        reverse=True
+    )
+    author_weights = power_law_weights(len(user_ids), alpha, rng)
+    with keep_created(Post, Comment):
+        bulk_insert(Post, (
+            Post(
+                author_id=author_id,
+                group_id=rng.choice(group_ids) if group_ids else None,
+                text=random_text(rng),
+                created=now - timedelta(seconds=offset),
+            )
+            for author_id, offset in zip(
+                rng.choices(user_ids, weights=author_weights, k=posts),
+                offsets
+            )
+        ))
+        post_ids = list(
+            Post.objects.filter(
+                author_id__in=user_ids
+            ).values_list('id', flat=True)
+        )
+        post_weights = power_law_weights(len(post_ids), alpha, rng)
+        bulk_insert(Comment, (
+            Comment(
+                post_id=post_id,
+                author_id=rng.choice(user_ids),
+                text=random_text(rng, words=6),
+                created=now - timedelta(seconds=rng.randrange(3600)),
+            )
+            for post_id in rng.choices(
+                post_ids,
+                weights=post_weights,
+                k=comments
+            )
+        ))
+    graph = set()
+    for user_id in user_ids:
+        following = min(int(rng.paretovariate(alpha) * follows), users - 1)
+        for author_id in rng.choices(
+            user_ids,
+            weights=author_weights,
+            k=following
+        ):
+            if author_id != user_id:
+                graph.add((user_id, author_id))
+    bulk_insert(Follow, (
+        Follow(user_id=user_id, author_id=author_id)
+        for user_id, author_id in graph
+    ))
+    for user_id, author_id in graph:
+        timeline.backfill(user_id, author_id)
+    counters.reconcile()
+    cache.clear()
+    return {
+        'users': len(user_ids),
+        'groups': len(group_ids),
+        'posts': len(post_ids),
+        'comments': comments,
+        'follows': len(graph),
+        'alpha': alpha,
+        'seed': seed,
+    }, user_ids
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, int(round(percent / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+def get_targets(user_ids):
+    users = User.objects.filter(id__in=user_ids)
+    author = users.annotate(
+        total=Count('posts')
+    ).order_by('-total').first()
+    reader = users.annotate(
+        total=Count('follower')
+    ).order_by('-total').first()
+    group = Group.objects.annotate(
+        total=Count('groups')
+    ).order_by('-total').first()
+    post = Post.objects.filter(
+        author__in=user_ids
+    ).order_by('-comments_count').first()
+    return author, reader, group, post
+
+
+def get_urls(user_ids, author, reader, group, post):
+    deep_page = max(1, Post.objects.count() // POSTS_ON_PAGE // 2)
+    cursor = CursorPaginator(Post.objects.all(), POSTS_ON_PAGE).encode_cursor(
+        Post.objects.all()[deep_page * POSTS_ON_PAGE - 1]
+    )
+    target = User.objects.filter(id__in=user_ids).exclude(
+        pk__in=(reader.pk, author.pk)
+    ).first()
+    return {
+        'index': ('get', reverse('posts:index'), None),
+        'index_deep_page': (
+            'get',
+            reverse('posts:index') + f'?page={deep_page}',
+            None
+        ),
+        'index_deep_cursor': (
+            'get',
+            reverse('posts:index') + f'?cursor={cursor}',
+            None
+        ),
+        'group_list': (
+            'get',
+            reverse('posts:group_list', args=(group.slug,)),
+            None
+        ),
+        'profile': (
+            'get',
+            reverse('posts:profile', args=(author.username,)),
+            None
+        ),
+        'post_detail': (
+            'get',
+            reverse('posts:post_detail', args=(post.pk,)),
+            None
+        ),
+        'search': ('get', reverse('posts:search') + f'?q={WORDS[0]}', None),
+        'follow_index': ('get', reverse('posts:follow_index'), reader),
+        'post_create': ('get', reverse('posts:post_create'), post.author),
+        'post_edit': (
+            'get',
+            reverse('posts:post_edit', args=(post.pk,)),
+            post.author
+        ),
+        'add_comment': (
+            'post',
+            reverse('posts:add_comment', args=(post.pk,)),
+            reader
+        ),
+        'profile_follow': (
+            'get',
+            reverse('posts:profile_follow', args=(target.username,)),
+            reader
+        ),
+        'profile_unfollow': (
+            'get',
+            reverse('posts:profile_unfollow', args=(target.username,)),
+            reader
+        ),
+    }
+
+
+def send(client, method, url):
+    if method == 'post':
+        return client.post(url, {'text': random_text(random.Random(url))})
+    return client.get(url)
+
+
+def template_time(response):
+    match = TEMPLATE_TIMING.search(response.get('Server-Timing', ''))
+    return float(match.group(1)) if match else 0.0
+
+
+def measure(method, url, user, requests):
+    client = Client()
+    if user is not None:
+        client.force_login(user)
+    first_started = time.perf_counter()
+    first_response = send(client, method, url)
+    first_ms = (time.perf_counter() - first_started) * 1000
+    timings = []
+    queries = []
+    templates = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as context:
+            request_started = time.perf_counter()
+            response = send(client, method, url)
+            timings.append((time.perf_counter() - request_started) * 1000)
+        queries.append(len(context.captured_queries))
+        templates.append(template_time(response))
+    elapsed = time.perf_counter() - started
+    result = {
+        f'p{percent}_ms': round(percentile(timings, percent), 3)
+        for percent in PERCENTILES
+    }
+    result['first_ms'] = round(first_ms, 3)
+    result['first_template_ms'] = round(template_time(first_response), 3)
+    result['template_p50_ms'] = round(percentile(templates, 50), 3)
+    result['queries_per_request'] = round(sum(queries) / len(queries), 2)
+    result['requests_per_second'] = round(requests / elapsed, 1)
+    result['url'] = url
+    return result
+
+
+def run(user_ids, requests, names=None):
+    urls = get_urls(user_ids, *get_targets(user_ids))
+    return {
+        name: measure(method, url, user, requests)
+        for name, (method, url, user) in urls.items()
+        if names is None or name in names
+    }
+
+
+def compare_template_loaders(user_ids, requests):
+    """Замеряет рендер страниц с обычными и кэширующими загрузчиками.
+
+    Кэш фрагментов отключается, чтобы каждый запрос рендерил шаблоны
+    целиком. Для кэширующего загрузчика шаблоны прогреваются заранее,
+    как при старте production-сервера.
+    """
+    results = {}
+    for label, loaders in TEMPLATE_LOADERS.items():
+        options = dict(settings.TEMPLATES[0]['OPTIONS'], loaders=loaders)
+        with override_settings(
+            TEMPLATES=[dict(settings.TEMPLATES[0], OPTIONS=options)],
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+            }},
+        ):
+            if label == 'cached':
+                warm_templates()
+            results[label] = run(user_ids, requests, TEMPLATE_PAGES)
+    return results
+
+
+def time_per_call(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return round((time.perf_counter() - started) / repeat * 1e6, 2)
+
+
+def context_overhead(user_ids, repeat):
+    """Замеряет, во что обходятся контекст-процессоры одному рендеру.
+
+    Для запроса каждой страницы считается время вызова всех процессоров
+    и время рендера шапки и подвала, которые используют их значения.
+    """
+    engine = engines['django'].engine
+    chrome = [engine.get_template(name) for name in CHROME_TEMPLATES]
+    urls = get_urls(user_ids, *get_targets(user_ids))
+    results = {}
+    for name in TEMPLATE_PAGES:
+        method, url, user = urls[name]
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        request = send(client, method, url).wsgi_request
+
+        def call_processors():
+            for processor in engine.template_context_processors:
+                processor(request)
+
+        def render_chrome():
+            for template in chrome:
+                template.render(RequestContext(request))
+
+        results[name] = {
+            'processors_us': time_per_call(call_processors, repeat),
+            'chrome_us': time_per_call(render_chrome, repeat),
+        }
+    return results
+
+
+def compare_sessions(user_ids, requests):
+    """Замеряет авторизованные страницы с сессиями в базе и с сессиями
+    и пользователем в кэше."""
+    author, reader, group, post = get_targets(user_ids)
+    urls = get_urls(user_ids, author, reader, group, post)
+    results = {}
+    for label, overrides in SESSION_SETUPS.items():
+        with override_settings(**overrides):
+            results[label] = {
+                name: measure(method, url, user or reader, requests)
+                for name, (method, url, user) in urls.items()
+                if name in SESSION_PAGES
+            }
+    return results
@@ -0,0 +1,79 @@
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+
+GLOBAL_SCOPE = 'global'
+INDEX_SCOPE = 'index'
+VERSION_KEY = 'posts:version:{}'
+MODIFIED_KEY = 'posts:modified:{}'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def profile_scope(user_id):
+    return f'profile:{user_id}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def new_version():
+    return time.time_ns()
+
+
+def get_version(*scopes):
+    keys = [VERSION_KEY.format(scope) for scope in (GLOBAL_SCOPE, *scopes)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, new_version(), None)
+            versions[key] = cache.get(key)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def bump_version(*scopes):
+    for scope in scopes:
+        key = VERSION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_version(), None)
+    modified = time.time()
+    cache.set_many(
+        {MODIFIED_KEY.format(scope): modified for scope in scopes},
+        None
+    )
+
+
+def bump_version_on_commit(*scopes):
+    """bump_version() сейчас и ещё раз после коммита транзакции.
+
+    Запрос между первым повышением и коммитом читает старый снимок базы
+    и кэширует его под промежуточной версией; второе повышение делает
+    такие записи недостижимыми.
+    """
+    bump_version(*scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump_version(*scopes))
+
+
+def get_last_modified(*scopes):
+    """
+    Время последнего bump_version() для scopes и глобальной области.
+    Меняется вместе с версией, поэтому удаление поста или комментария,
+    подписка и правка группы тоже сдвигают Last-Modified. Если время
+    выпало из кэша, страница считается изменённой сейчас.
+    """
+    keys = [MODIFIED_KEY.format(scope) for scope in (GLOBAL_SCOPE, *scopes)]
+    modified = cache.get_many(keys)
+    now = time.time()
+    for key in keys:
+        if key not in modified:
+            cache.add(key, now, None)
+            modified[key] = cache.get(key, now)
+    return datetime.fromtimestamp(max(modified.values()), timezone.utc)
@@ -0,0 +1,143 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
+
+from .caching import (
+    INDEX_SCOPE, get_last_modified, get_version, group_scope, post_scope,
+    profile_scope
+)
+from .models import Group, Post, User
+
+PAGE_KEY = 'posts:page:{}.{}'
+
+
+def make_etag(request, state):
+    """ETag из state, пользователя, адреса и CSRF-токена: страница с
+    формой после смены токена (например, при входе) отдаётся заново."""
+    user = request.user.pk if request.user.is_authenticated else ''
+    csrf = request.META.get('CSRF_COOKIE', '')
+    path = request.get_full_path()
+    return hashlib.md5(f'{state}:{user}:{csrf}:{path}'.encode()).hexdigest()
+
+
+def page_state(request, get_state, *args, **kwargs):
+    if not hasattr(request, '_page_state'):
+        request._page_state = get_state(request, *args, **kwargs)
+    return request._page_state
+
+
+def conditional_page(get_state):
+    """
+    condition() для страницы, у которой get_state(request, *args, **kwargs)
+    возвращает (state, last_modified). ETag строится из state, текущего
+    пользователя, CSRF-токена и адреса; get_state вызывается один раз на
+    запрос. Если страница при отрисовке выдала новый CSRF-токен, ETag
+    ответа пересчитывается с ним.
+    """
+    def state(request, *args, **kwargs):
+        return page_state(request, get_state, *args, **kwargs)
+
+    def etag_func(request, *args, **kwargs):
+        page_state, _ = state(request, *args, **kwargs)
+        if page_state is None:
+            return None
+        return make_etag(request, page_state)
+
+    def last_modified_func(request, *args, **kwargs):
+        return state(request, *args, **kwargs)[1]
+
+    def decorator(view):
+        @wraps(view)
+        def with_etag(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            etag = etag_func(request, *args, **kwargs)
+            if etag is not None and request.method in ('GET', 'HEAD'):
+                response['ETag'] = quote_etag(etag)
+            return response
+
+        return condition(
+            etag_func=etag_func,
+            last_modified_func=last_modified_func
+        )(with_etag)
+    return decorator
+
+
+def is_cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_USED')
+        and not getattr(request, '_stale_fragment', False)
+    )
+
+
+def anonymous_page_cache(get_state):
+    """
+    Кэширует ответ целиком для анонимных пользователей. Ключ строится из
+    адреса с query string и state страницы, поэтому сохранение поста,
+    комментария или группы сбрасывает только затронутые страницы.
+    Ответы с CSRF-токеном или cookie не кэшируются.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+            state, _ = page_state(request, get_state, *args, **kwargs)
+            if state is None:
+                return view(request, *args, **kwargs)
+            path = request.get_full_path().encode()
+            key = PAGE_KEY.format(hashlib.md5(path).hexdigest(), state)
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if is_cacheable(request, response):
+                    cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+
+def index_state(request):
+    return get_version(INDEX_SCOPE), get_last_modified(INDEX_SCOPE)
+
+
+def group_state(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk',
+        flat=True
+    ).first()
+    if group_id is None:
+        return None, None
+    scope = group_scope(group_id)
+    return get_version(scope), get_last_modified(scope)
+
+
+def profile_state(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk',
+        flat=True
+    ).first()
+    if author_id is None:
+        return None, None
+    scope = profile_scope(author_id)
+    return get_version(scope), get_last_modified(scope)
+
+
+def post_state(request, post_id):
+    author_id = Post.objects.filter(pk=post_id).values_list(
+        'author_id',
+        flat=True
+    ).first()
+    if author_id is None:
+        return None, None
+    scopes = (post_scope(post_id), profile_scope(author_id))
+    return get_version(*scopes), get_last_modified(*scopes)
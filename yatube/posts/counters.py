@@ -0,0 +1,78 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, Profile, User
+
+
+def change_profile(user_id, **deltas):
+    Profile.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def change_comments(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def _count(queryset, field, outer='user_id'):
+    return Coalesce(
+        Subquery(
+            queryset
+            .filter(**{field: OuterRef(outer)})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0
+    )
+
+
+def _fix(queryset, field, actual):
+    return queryset.annotate(
+        actual=actual
+    ).exclude(
+        **{field: F('actual')}
+    ).update(**{field: actual})
+
+
+def reconcile_posts(user_ids):
+    """Пересчитывает posts_count только у профилей user_ids."""
+    return _fix(
+        Profile.objects.filter(user_id__in=user_ids),
+        'posts_count',
+        _count(Post.objects.all(), 'author'),
+    )
+
+
+def reconcile():
+    users = User.objects.filter(profile__isnull=True)
+    Profile.objects.bulk_create(
+        (Profile(user=user) for user in users.iterator()),
+        ignore_conflicts=True,
+    )
+    profiles = Profile.objects.all()
+    return {
+        'posts_count': _fix(
+            profiles,
+            'posts_count',
+            _count(Post.objects.all(), 'author'),
+        ),
+        'followers_count': _fix(
+            profiles,
+            'followers_count',
+            _count(Follow.objects.all(), 'author'),
+        ),
+        'following_count': _fix(
+            profiles,
+            'following_count',
+            _count(Follow.objects.all(), 'user'),
+        ),
+        'comments_count': _fix(
+            Post.objects.all(),
+            'comments_count',
+            _count(Comment.objects.all(), 'post', outer='pk'),
+        ),
+    }
@@ -0,0 +1,67 @@
+import csv
+import json
+
+from django.conf import settings
+
+from .models import Comment
+
+FORMATS = ('jsonl', 'csv')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+FIELDS = ('type', 'id', 'post', 'author', 'group', 'created', 'text', 'image')
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def export_rows(post_list, chunk_size):
+    posts = post_list.select_related('author', 'group').order_by('pk')
+    for post in posts.iterator(chunk_size=chunk_size):
+        yield {
+            'type': 'post',
+            'id': post.pk,
+            'author': post.author.username,
+            'group': post.group.slug if post.group else '',
+            'created': post.created.isoformat(),
+            'text': post.text,
+            'image': post.image.name,
+        }
+    comments = Comment.objects.filter(
+        post__in=post_list.values('pk')
+    ).select_related('author').order_by('pk')
+    for comment in comments.iterator(chunk_size=chunk_size):
+        yield {
+            'type': 'comment',
+            'id': comment.pk,
+            'post': comment.post_id,
+            'author': comment.author.username,
+            'created': comment.created.isoformat(),
+            'text': comment.text,
+        }
+
+
+def encode_rows(rows, file_format):
+    if file_format == 'csv':
+        writer = csv.DictWriter(Echo(), fieldnames=FIELDS)
+        yield writer.writeheader()
+        for row in rows:
+            yield writer.writerow(row)
+        return
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def stream_export(post_list, file_format, chunk_size=None):
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    lines = []
+    for line in encode_rows(export_rows(post_list, chunk_size), file_format):
+        lines.append(line)
+        if len(lines) == chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
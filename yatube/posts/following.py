@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from . import counters, timeline
+from .caching import bump_version, profile_scope
+from .models import Follow
+
+FOLLOWING_KEY = 'posts:following:{}'
+FOLLOW_SQL = (
+    'INSERT INTO {table} ({user}, {author}) VALUES (%s, %s) '
+    'ON CONFLICT DO NOTHING'
+)
+UNFOLLOW_SQL = 'DELETE FROM {table} WHERE {user} = %s AND {author} = %s'
+
+
+def following_ids(user):
+    """Множество id авторов, на которых подписан пользователь.
+
+    Загружается одним запросом, хранится в кэше и запоминается на
+    объекте пользователя до конца запроса.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    if not hasattr(user, '_following_ids'):
+        key = FOLLOWING_KEY.format(user.pk)
+        ids = cache.get(key)
+        if ids is None:
+            ids = frozenset(
+                Follow.objects.filter(
+                    user_id=user.pk
+                ).values_list('author_id', flat=True)
+            )
+            cache.set(key, ids, settings.FOLLOWING_CACHE_TIMEOUT)
+        user._following_ids = ids
+    return user._following_ids
+
+
+def is_following(user, author_id):
+    return author_id in following_ids(user)
+
+
+def forget(user_id):
+    cache.delete(FOLLOWING_KEY.format(user_id))
+
+
+def forget_after_commit(user_id, author_id):
+    """Сбрасывает кэш подписок и версии профилей после коммита.
+
+    Если сбросить их внутри транзакции, параллельный запрос успеет
+    прочитать старый снимок базы и снова положить его в кэш.
+    """
+    def forget_follow():
+        forget(user_id)
+        bump_version(profile_scope(author_id), profile_scope(user_id))
+
+    transaction.on_commit(forget_follow)
+
+
+def followed(user_id, author_id):
+    counters.change_profile(author_id, followers_count=1)
+    counters.change_profile(user_id, following_count=1)
+    timeline.backfill(user_id, author_id)
+    forget_after_commit(user_id, author_id)
+
+
+def unfollowed(user_id, author_id):
+    counters.change_profile(author_id, followers_count=-1)
+    counters.change_profile(user_id, following_count=-1)
+    timeline.remove_author(user_id, author_id)
+    forget_after_commit(user_id, author_id)
+
+
+def _execute(sql, user_id, author_id):
+    quote = connection.ops.quote_name
+    meta = Follow._meta
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.format(
+                table=quote(meta.db_table),
+                user=quote(meta.get_field('user').column),
+                author=quote(meta.get_field('author').column),
+            ),
+            (user_id, author_id)
+        )
+        return cursor.rowcount
+
+
+def follow(user_id, author_id):
+    """Подписывает одним INSERT без ошибки на повторной подписке.
+
+    Счётчики, лента и кэши меняются, только если строка действительно
+    вставлена. Возвращает True для новой подписки.
+    """
+    if user_id == author_id:
+        return False
+    with transaction.atomic():
+        if not _execute(FOLLOW_SQL, user_id, author_id):
+            return False
+        followed(user_id, author_id)
+    return True
+
+
+def unfollow(user_id, author_id):
+    """Отписывает одним DELETE; повторная отписка ничего не меняет."""
+    with transaction.atomic():
+        if not _execute(UNFOLLOW_SQL, user_id, author_id):
+            return False
+        unfollowed(user_id, author_id)
+    return True
@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image, ImageOps
+
+KEEP_FORMATS = ('JPEG', 'PNG', 'GIF')
+ALPHA_MODES = ('RGBA', 'LA', 'PA')
+
+
+def needs_normalizing(image, size):
+    max_width, max_height = settings.IMAGE_MAX_SIZE
+    return (
+        image.width > max_width
+        or image.height > max_height
+        or image.format not in KEEP_FORMATS
+        or 'exif' in image.info
+        or size > settings.IMAGE_REENCODE_SIZE
+    )
+
+
+def has_alpha(image):
+    return image.mode in ALPHA_MODES or 'transparency' in image.info
+
+
+def normalize_image(upload):
+    """
+    Уменьшает загруженную картинку до IMAGE_MAX_SIZE, применяет и удаляет
+    EXIF и перекодирует её в progressive JPEG (PNG, если есть
+    прозрачность). Маленькие картинки без метаданных и анимации
+    возвращаются как есть. Pillow читает файл загрузки с диска, а JPEG
+    декодируется сразу в уменьшенном масштабе через draft().
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    if getattr(image, 'is_animated', False) or not needs_normalizing(
+        image,
+        upload.size
+    ):
+        upload.seek(0)
+        return upload
+    image.draft('RGB', settings.IMAGE_MAX_SIZE)
+    icc_profile = image.info.get('icc_profile')
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(settings.IMAGE_MAX_SIZE, Image.LANCZOS)
+    if has_alpha(image):
+        image = image.convert('RGBA')
+        file_format, extension, options = 'PNG', '.png', {'optimize': True}
+    else:
+        image = image.convert('RGB')
+        file_format, extension, options = 'JPEG', '.jpg', {
+            'quality': settings.IMAGE_JPEG_QUALITY,
+            'optimize': True,
+            'progressive': True,
+        }
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    output = tempfile.SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    )
+    image.save(output, file_format, **options)
+    size = output.tell()
+    output.seek(0)
+    name = os.path.splitext(os.path.basename(upload.name))[0] + extension
+    return UploadedFile(
+        file=output,
+        name=name,
+        content_type=Image.MIME[file_format],
+        size=size,
+    )
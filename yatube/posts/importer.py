@@ -0,0 +1,186 @@
+import csv
+import json
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters, timeline
+from .caching import GLOBAL_SCOPE, bump_version
+from .models import Follow, Group, Post, User
+from .thumbnails import schedule_thumbnails
+from .utils import keep_created
+
+FORMATS = ('jsonl', 'csv')
+IMAGE_DIR = 'posts/'
+LOOKUP_CHUNK_SIZE = 500
+
+
+def read_rows(file, file_format):
+    if file_format == 'csv':
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as error:
+            yield error
+
+
+class PostImporter:
+    def __init__(self, batch_size, images_dir=None, create_missing=False,
+                 on_error=None, on_batch=None):
+        self.batch_size = batch_size
+        self.images_dir = images_dir
+        self.create_missing = create_missing
+        self.on_error = on_error or (lambda number, error: None)
+        self.on_batch = on_batch or (lambda importer: None)
+        self.authors = dict(User.objects.values_list('username', 'id'))
+        self.groups = dict(Group.objects.values_list('slug', 'id'))
+        self.author_ids = set()
+        self.image_names = []
+        self.imported = 0
+        self.skipped = 0
+        self.started = None
+
+    @property
+    def rows_per_second(self):
+        elapsed = time.perf_counter() - self.started
+        return (self.imported + self.skipped) / elapsed if elapsed else 0
+
+    def get_author(self, username):
+        if not username:
+            raise ValueError('не указан автор')
+        if username not in self.authors:
+            if not self.create_missing:
+                raise ValueError(f'нет пользователя {username}')
+            self.authors[username] = User.objects.create(
+                username=username,
+                password=make_password(None)
+            ).pk
+        return self.authors[username]
+
+    def get_group(self, slug):
+        if not slug:
+            return None
+        if slug not in self.groups:
+            if not self.create_missing:
+                raise ValueError(f'нет группы {slug}')
+            self.groups[slug] = Group.objects.create(
+                title=slug,
+                slug=slug,
+                description=''
+            ).pk
+        return self.groups[slug]
+
+    def get_created(self, value):
+        if not value:
+            return timezone.now()
+        created = parse_datetime(value)
+        if created is None:
+            raise ValueError(f'неверная дата {value}')
+        if timezone.is_naive(created):
+            created = timezone.make_aware(created)
+        return created
+
+    def copy_image(self, path):
+        if not path:
+            return ''
+        if self.images_dir and not os.path.isabs(path):
+            path = os.path.join(self.images_dir, path)
+        with open(path, 'rb') as source:
+            return default_storage.save(
+                IMAGE_DIR + os.path.basename(path),
+                File(source)
+            )
+
+    @staticmethod
+    def get_field(row, name):
+        value = row.get(name)
+        if value is None:
+            return ''
+        if not isinstance(value, str):
+            raise ValueError(f'поле {name} должно быть строкой')
+        return value
+
+    def build_post(self, row):
+        if isinstance(row, ValueError):
+            raise row
+        if not isinstance(row, dict):
+            raise ValueError('строка должна быть объектом')
+        text = self.get_field(row, 'text').strip()
+        if not text:
+            raise ValueError('пустой текст')
+        author_id = self.get_author(self.get_field(row, 'author'))
+        post = Post(
+            author_id=author_id,
+            group_id=self.get_group(self.get_field(row, 'group')),
+            text=text,
+            created=self.get_created(self.get_field(row, 'created')),
+            image=self.copy_image(self.get_field(row, 'image')),
+        )
+        self.author_ids.add(author_id)
+        return post
+
+    def flush(self, batch):
+        if not batch:
+            return
+        with transaction.atomic():
+            Post.objects.bulk_create(batch)
+        self.image_names.extend(
+            post.image.name for post in batch if post.image
+        )
+        self.imported += len(batch)
+        self.on_batch(self)
+
+    def run(self, rows):
+        """Импортирует строки пачками. finish() выполняется и после
+        ошибки: уже записанные пачки остаются в базе, и счётчики, ленты
+        и кэш должны с ними совпадать."""
+        self.started = time.perf_counter()
+        batch = []
+        try:
+            with keep_created(Post):
+                for number, row in enumerate(rows, start=1):
+                    if (
+                        isinstance(row, dict)
+                        and row.get('type', 'post') != 'post'
+                    ):
+                        continue
+                    try:
+                        batch.append(self.build_post(row))
+                    except (ValueError, OSError) as error:
+                        self.skipped += 1
+                        self.on_error(number, error)
+                        continue
+                    if len(batch) >= self.batch_size:
+                        self.flush(batch)
+                        batch = []
+                self.flush(batch)
+        finally:
+            self.finish()
+
+    def finish(self):
+        """Пересчитывает posts_count авторов импорта, дополняет ленты их
+        подписчиков и ставит в очередь миниатюры записанных картинок.
+        У новых постов нет комментариев, поэтому полная сверка остаётся
+        команде reconcile_counters."""
+        author_ids = sorted(self.author_ids)
+        for start in range(0, len(author_ids), LOOKUP_CHUNK_SIZE):
+            chunk = author_ids[start:start + LOOKUP_CHUNK_SIZE]
+            counters.reconcile_posts(chunk)
+            follows = Follow.objects.filter(
+                author_id__in=chunk
+            ).values_list('user_id', 'author_id')
+            for user_id, author_id in list(follows):
+                timeline.backfill(user_id, author_id)
+        for image_name in self.image_names:
+            schedule_thumbnails(image_name)
+        bump_version(GLOBAL_SCOPE)
@@ -0,0 +1,109 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment, teardown_test_environment
+)
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет отдельную тестовую базу синтетическими данными и '
+        'замеряет задержку, число запросов и пропускную способность '
+        'страниц posts'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument(
+            '--follows',
+            type=int,
+            default=10,
+            help='Масштаб числа подписок на пользователя'
+        )
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=1.5,
+            help='Показатель степенного распределения'
+        )
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--output', help='Файл для JSON-отчёта')
+        parser.add_argument(
+            '--templates',
+            action='store_true',
+            help='Сравнить рендер с обычным и кэширующим загрузчиком шаблонов'
+        )
+        parser.add_argument(
+            '--context',
+            action='store_true',
+            help='Замерить работу контекст-процессоров на рендер страницы'
+        )
+        parser.add_argument(
+            '--sessions',
+            action='store_true',
+            help='Сравнить сессии в базе с сессиями и пользователем в кэше'
+        )
+        parser.add_argument(
+            '--use-current-db',
+            action='store_true',
+            help='Заполнять текущую базу вместо временной тестовой'
+        )
+
+    def handle(self, *args, **options):
+        old_name = None
+        if not options['use_current_db']:
+            setup_test_environment()
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(
+                verbosity=0,
+                autoclobber=True,
+                serialize=False
+            )
+        try:
+            dataset, user_ids = benchmark.seed(
+                users=options['users'],
+                groups=options['groups'],
+                posts=options['posts'],
+                comments=options['comments'],
+                follows=options['follows'],
+                alpha=options['alpha'],
+                seed=options['seed'],
+            )
+            report = {
+                'dataset': dataset,
+                'requests': options['requests'],
+                'results': benchmark.run(user_ids, options['requests']),
+            }
+            if options['templates']:
+                report['templates'] = benchmark.compare_template_loaders(
+                    user_ids,
+                    options['requests']
+                )
+            if options['sessions']:
+                report['sessions'] = benchmark.compare_sessions(
+                    user_ids,
+                    options['requests']
+                )
+            if options['context']:
+                report['context'] = benchmark.context_overhead(
+                    user_ids,
+                    options['requests']
+                )
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
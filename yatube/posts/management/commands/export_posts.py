@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.exporter import FORMATS, stream_export
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает посты и комментарии автора или группы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', help='Имя пользователя')
+        parser.add_argument('--group', help='Метка группы')
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument('--output', help='Файл; по умолчанию stdout')
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        if bool(options['author']) == bool(options['group']):
+            raise CommandError('Укажите либо --author, либо --group')
+        try:
+            if options['author']:
+                author = User.objects.get(username=options['author'])
+                post_list = Post.objects.filter(author=author)
+            else:
+                group = Group.objects.get(slug=options['group'])
+                post_list = Post.objects.filter(group=group)
+        except (User.DoesNotExist, Group.DoesNotExist):
+            raise CommandError('Автор или группа не найдены')
+        chunks = stream_export(
+            post_list,
+            options['format'],
+            options['chunk_size']
+        )
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        newline = '' if options['format'] == 'csv' else None
+        with open(
+            options['output'], 'w', encoding='utf-8', newline=newline
+        ) as file:
+            for chunk in chunks:
+                file.write(chunk)
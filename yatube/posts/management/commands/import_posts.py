@@ -0,0 +1,68 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importer import FORMATS, PostImporter, read_rows
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Импортирует посты из JSONL или CSV пакетными вставками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с постами')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файла; по умолчанию берётся из расширения'
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--images-dir',
+            help='Каталог, от которого считаются пути картинок'
+        )
+        parser.add_argument(
+            '--create-missing',
+            action='store_true',
+            help='Создавать неизвестных авторов и группы'
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        file_format = options['format']
+        if file_format is None:
+            file_format = os.path.splitext(options['path'])[1].lstrip('.')
+        if file_format not in FORMATS:
+            raise CommandError(
+                f'Неизвестный формат {file_format!r}, укажите --format'
+            )
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        importer = PostImporter(
+            batch_size=options['batch_size'],
+            images_dir=options['images_dir'],
+            create_missing=options['create_missing'],
+            on_error=self.report_error,
+            on_batch=self.report_batch,
+        )
+        newline = '' if file_format == 'csv' else None
+        with open(options['path'], encoding='utf-8', newline=newline) as file:
+            importer.run(read_rows(file, file_format))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Импортировано постов: {importer.imported}, '
+                f'пропущено строк: {importer.skipped}, '
+                f'{importer.rows_per_second:.0f} строк/с'
+            )
+        )
+
+    def report_error(self, number, error):
+        self.stderr.write(f'Строка {number}: {error}')
+
+    def report_batch(self, importer):
+        if self.verbosity > 1:
+            self.stdout.write(
+                f'{importer.imported} постов, '
+                f'{importer.rows_per_second:.0f} строк/с'
+            )
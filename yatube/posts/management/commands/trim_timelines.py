@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.timeline import trim_timelines
+
+
+class Command(BaseCommand):
+    help = 'Обрезает ленты подписок до TIMELINE_LENGTH записей'
+
+    def handle(self, *args, **options):
+        deleted = trim_timelines()
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено записей лент: {deleted}')
+        )
@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.thumbnails import make_thumbnails_in_worker
+
+BATCH_SIZE = 100
+WORKERS = 4
+
+
+class Command(BaseCommand):
+    help = 'Создаёт миниатюры для всех картинок постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=WORKERS)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        images = Post.objects.exclude(image='').values_list(
+            'image',
+            flat=True
+        ).order_by().iterator(chunk_size=options['batch_size'])
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                batch = list(islice(images, options['batch_size']))
+                if not batch:
+                    break
+                for result in executor.map(make_thumbnails_in_worker, batch):
+                    if result:
+                        done += 1
+                    else:
+                        failed += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Миниатюры готовы: {done}, с ошибками: {failed}'
+            )
+        )
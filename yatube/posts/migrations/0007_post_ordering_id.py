@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_auto_20220403_2039'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ('-created', '-id'), 'verbose_name': 'Публикация', 'verbose_name_plural': 'Публикации'},
+        ),
+    ]
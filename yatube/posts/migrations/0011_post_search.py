@@ -0,0 +1,16 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:10
+
+from django.db import migrations
+
+from posts.search import install_fts, uninstall_fts
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_fts, uninstall_fts),
+    ]
@@ -0,0 +1,170 @@
+import base64
+import hashlib
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+COUNT_KEY = 'posts:count:{}'
+INTEGER_RANGE = (-2 ** 63, 2 ** 63 - 1)
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page of %s objects>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинатор: страница выбирается по ключам сортировки
+    крайнего объекта предыдущей страницы, без OFFSET и COUNT(*)."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, ordering=('-created', '-pk')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.keys = tuple(field.lstrip('-') for field in self.ordering)
+        model = object_list.model
+        self.fields = tuple(
+            model._meta.pk if key == 'pk' else model._meta.get_field(key)
+            for key in self.keys
+        )
+
+    def encode_cursor(self, obj, reverse=False):
+        values = [field.value_to_string(obj) for field in self.fields]
+        data = json.dumps([int(reverse), *values]).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            reverse, *values = data
+            if len(values) != len(self.fields):
+                raise InvalidCursor
+            values = [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, OverflowError, ValidationError):
+            raise InvalidCursor
+        low, high = INTEGER_RANGE
+        for value in values:
+            if value is None or (
+                isinstance(value, int) and not low <= value <= high
+            ):
+                raise InvalidCursor
+        return values, bool(reverse)
+
+    def _after(self, values, forward):
+        lookup = 'lt' if forward == self.descending else 'gt'
+        keys = list(zip(self.keys, values))
+        key, value = keys.pop()
+        condition = Q(**{f'{key}__{lookup}': value})
+        for key, value in reversed(keys):
+            condition = Q(**{f'{key}__{lookup}e': value}) & (
+                Q(**{f'{key}__{lookup}': value}) | condition
+            )
+        return condition
+
+    def page(self, cursor):
+        values, reverse = None, False
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+        ordering = self.ordering
+        queryset = self.object_list
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith('-') else '-' + field
+                for field in ordering
+            )
+        if values is not None:
+            queryset = queryset.filter(self._after(values, not reverse))
+        items = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if reverse:
+            items.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        next_cursor = previous_cursor = None
+        if items and has_next:
+            next_cursor = self.encode_cursor(items[-1])
+        if items and has_previous:
+            previous_cursor = self.encode_cursor(items[0], reverse=True)
+        return CursorPage(items, self, next_cursor, previous_cursor)
+
+    def get_page(self, cursor):
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator с COUNT(*) из кэша. Ключ строится по SQL выборки и
+    версии области кэша, так что сигналы, меняющие версию, сбрасывают
+    и счётчик. Для выборок больше PAGINATOR_APPROXIMATE_COUNT после
+    смены версии отдаётся недавнее значение: пересчёт идёт не чаще
+    раза в PAGINATOR_APPROXIMATE_TIMEOUT секунд."""
+
+    def __init__(self, object_list, per_page, version, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.version = version
+
+    @cached_property
+    def count_key(self):
+        sql = str(self.object_list.query).encode()
+        return COUNT_KEY.format(hashlib.md5(sql).hexdigest())
+
+    @cached_property
+    def count(self):
+        key = f'{self.count_key}.{self.version}'
+        count = cache.get(key)
+        if count is not None:
+            return count
+        recent = cache.get(self.count_key)
+        approximate_timeout = settings.PAGINATOR_APPROXIMATE_TIMEOUT
+        if (
+            recent is not None
+            and recent >= settings.PAGINATOR_APPROXIMATE_COUNT
+        ):
+            cache.set(key, recent, approximate_timeout)
+            return recent
+        count = self.object_list.count()
+        cache.set(key, count, settings.PAGINATOR_COUNT_TIMEOUT)
+        cache.set(self.count_key, count, approximate_timeout)
+        return count
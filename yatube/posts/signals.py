@@ -0,0 +1,82 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import counters, following, timeline
+from .caching import (
+    GLOBAL_SCOPE, INDEX_SCOPE, bump_version_on_commit, group_scope,
+    post_scope, profile_scope
+)
+from .models import Comment, Follow, Group, Post, Profile, User
+
+
+def bump_post_scopes(post):
+    scopes = {
+        INDEX_SCOPE,
+        group_scope(post.group_id),
+        profile_scope(post.author_id),
+        post_scope(post.pk),
+    }
+    loaded_values = getattr(post, '_loaded_values', {})
+    if 'group_id' in loaded_values:
+        scopes.add(group_scope(loaded_values['group_id']))
+    bump_version_on_commit(*scopes)
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, **kwargs):
+    if created:
+        Profile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.change_profile(instance.author_id, posts_count=1)
+        timeline.fan_out(instance)
+    bump_post_scopes(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_profile(instance.author_id, posts_count=-1)
+    bump_post_scopes(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.change_comments(instance.post_id, 1)
+    bump_version_on_commit(post_scope(instance.post_id))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.change_comments(instance.post_id, -1)
+    bump_version_on_commit(post_scope(instance.post_id))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    # Вне страницы группы виден только slug: в ссылках карточек постов.
+    loaded_values = getattr(instance, '_loaded_values', {})
+    if not created and loaded_values.get('slug') != instance.slug:
+        bump_version_on_commit(GLOBAL_SCOPE)
+    else:
+        bump_version_on_commit(group_scope(instance.pk))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    # Посты группы остаются без неё, а SET_NULL не шлёт сигналов постов.
+    bump_version_on_commit(GLOBAL_SCOPE)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        following.followed(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    following.unfollowed(instance.user_id, instance.author_id)
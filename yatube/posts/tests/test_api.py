@@ -0,0 +1,219 @@
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings, TestCase
+from django.urls import reverse
+from sorl.thumbnail import get_thumbnail
+
+from posts.models import Comment, Follow, Group, Post, User
+from posts.tests.utils import run_on_commit
+from yatube.settings import POSTS_ON_PAGE
+
+AUTHOR = 'auth'
+COMMENT_TEXT = 'Комментарий'
+GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00'
+    b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+    b'\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+GROUP_SLUG = 'test-slug'
+NAME_FILE = 'small.gif'
+NOT_AUTHOR = 'not_author'
+POST_TEXT = 'Тестовая пост'
+REVERSE_API_FOLLOW = reverse('posts:api_follow_index')
+REVERSE_API_INDEX = reverse('posts:api_index')
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=AUTHOR)
+        cls.not_author = User.objects.create_user(username=NOT_AUTHOR)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        cls.image_post = Post.objects.create(
+            author=cls.author,
+            text=POST_TEXT,
+            group=cls.group,
+            image=SimpleUploadedFile(
+                name=NAME_FILE,
+                content=GIF,
+                content_type='image/gif'
+            ),
+        )
+        for i in range(POSTS_ON_PAGE + 2):
+            cls.last_post = Post.objects.create(
+                author=cls.author,
+                text=f'{POST_TEXT} {i}',
+                group=cls.group,
+            )
+        Comment.objects.create(
+            post=cls.last_post,
+            author=cls.not_author,
+            text=COMMENT_TEXT,
+        )
+        Follow.objects.create(user=cls.not_author, author=cls.author)
+        cls.feeds = (
+            REVERSE_API_INDEX,
+            reverse('posts:api_group_list', args=(GROUP_SLUG,)),
+            reverse('posts:api_profile', args=(AUTHOR,)),
+            REVERSE_API_FOLLOW,
+        )
+        cls.reverse_detail = reverse(
+            'posts:api_post_detail',
+            args=(cls.last_post.pk,)
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.follower_client = Client()
+        self.follower_client.force_login(self.not_author)
+        cache.clear()
+
+    def test_feeds_follow_cursor(self):
+        for url in self.feeds:
+            with self.subTest(url=url):
+                first_page = self.follower_client.get(url).json()
+                self.assertEqual(len(first_page['results']), POSTS_ON_PAGE)
+                self.assertEqual(
+                    first_page['results'][0]['id'],
+                    self.last_post.pk
+                )
+                self.assertIsNone(first_page['previous'])
+                second_page = self.follower_client.get(
+                    first_page['next']
+                ).json()
+                self.assertEqual(len(second_page['results']), 3)
+                self.assertEqual(
+                    second_page['results'][-1]['id'],
+                    self.image_post.pk
+                )
+                self.assertIsNone(second_page['next'])
+
+    def test_thumbnail_url_matches_sorl(self):
+        geometry, options = settings.THUMBNAIL_GEOMETRIES[0]
+        thumbnail = get_thumbnail(self.image_post.image, geometry, **options)
+        response = self.client.get(
+            reverse('posts:api_post_detail', args=(self.image_post.pk,))
+        )
+        self.assertEqual(response.json()['thumbnail'], thumbnail.url)
+
+    def test_thumbnail_is_null_until_created(self):
+        post = Post.objects.create(
+            author=self.author,
+            text=POST_TEXT,
+            image=SimpleUploadedFile(
+                name='missing.gif',
+                content=GIF,
+                content_type='image/gif'
+            ),
+        )
+        response = self.client.get(
+            reverse('posts:api_post_detail', args=(post.pk,))
+        )
+        self.assertIsNone(response.json()['thumbnail'])
+        self.assertEqual(response.json()['image'], post.image.url)
+
+    def test_post_detail(self):
+        data = self.client.get(self.reverse_detail).json()
+        self.assertEqual(data['text'], self.last_post.text)
+        self.assertEqual(data['group']['slug'], GROUP_SLUG)
+        self.assertEqual(data['comments_count'], 1)
+        self.assertEqual(data['comments'][0]['text'], COMMENT_TEXT)
+        response = self.client.get(
+            reverse('posts:api_post_detail', args=(0,))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_follow_requires_login(self):
+        response = self.client.get(REVERSE_API_FOLLOW)
+        self.assertEqual(response.status_code, 401)
+
+    def test_num_queries(self):
+        pages_queries = {
+            REVERSE_API_INDEX: (1, 1),
+            self.feeds[1]: (2, 2),
+            self.feeds[2]: (2, 2),
+            self.reverse_detail: (3, 3),
+        }
+        for url, (queries, cached_queries) in pages_queries.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    self.client.get(url)
+                with self.assertNumQueries(cached_queries):
+                    self.client.get(url + '?cursor=')
+
+    def test_not_modified(self):
+        etags = {}
+        for url in (*self.feeds, self.reverse_detail):
+            with self.subTest(url=url):
+                response = self.follower_client.get(url)
+                etags[url] = response['ETag']
+                response = self.follower_client.get(
+                    url,
+                    HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertEqual(response.status_code, 304)
+                response = self.follower_client.get(
+                    url,
+                    HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                )
+                self.assertEqual(response.status_code, 304)
+        with run_on_commit():
+            Comment.objects.create(
+                post=self.last_post,
+                author=self.author,
+                text=COMMENT_TEXT,
+            )
+            Post.objects.create(
+                author=self.author,
+                text=POST_TEXT,
+                group=self.group,
+            )
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.follower_client.get(
+                    url,
+                    HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_last_modified_moves_on_delete(self):
+        changes = {
+            'post': (self.feeds, Post.objects.get(pk=self.image_post.pk)),
+            'comment': ((self.reverse_detail,), self.last_post.comments.get()),
+        }
+        later = 0
+        for change, (urls, instance) in changes.items():
+            last_modified = {
+                url: self.follower_client.get(url)['Last-Modified']
+                for url in urls
+            }
+            later = max(later, time.time()) + 1
+            with mock.patch('posts.caching.time.time', return_value=later):
+                with run_on_commit():
+                    instance.delete()
+            for url in urls:
+                with self.subTest(change=change, url=url):
+                    response = self.follower_client.get(
+                        url,
+                        HTTP_IF_MODIFIED_SINCE=last_modified[url]
+                    )
+                    self.assertEqual(response.status_code, 200)
@@ -0,0 +1,334 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import engines
+from django.test import override_settings, TestCase, TransactionTestCase
+from sorl.thumbnail import get_thumbnail
+
+from core.template_backends import template_names, warm_templates
+from posts.importer import PostImporter
+from posts.models import Comment, Follow, Group, Post, Profile, User
+from posts.tests.utils import run_on_commit
+from posts.thumbnails import thumbnail_name
+
+AUTHOR = 'auth'
+COMMENT_TEXT = 'Комментарий'
+GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00'
+    b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+    b'\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+GROUP_SLUG = 'test-slug'
+NAME_FILE = 'small.gif'
+NOT_AUTHOR = 'not_author'
+POST_TEXT = 'Тестовая пост'
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+class ReconcileCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=AUTHOR)
+        cls.not_author = User.objects.create_user(username=NOT_AUTHOR)
+        cls.post = Post.objects.create(author=cls.author, text=POST_TEXT)
+        Comment.objects.create(
+            author=cls.not_author,
+            text=COMMENT_TEXT,
+            post=cls.post
+        )
+        Follow.objects.create(user=cls.not_author, author=cls.author)
+
+    def test_reconcile_counters(self):
+        Profile.objects.update(
+            posts_count=10,
+            followers_count=10,
+            following_count=10
+        )
+        Post.objects.update(comments_count=10)
+        Profile.objects.filter(user=self.not_author).delete()
+        call_command('reconcile_counters', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        self.assertEqual(
+            Profile.objects.values_list(
+                'user__username',
+                'posts_count',
+                'followers_count',
+                'following_count'
+            ).order_by('user__username')[::1],
+            [(AUTHOR, 1, 1, 0), (NOT_AUTHOR, 0, 0, 1)]
+        )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class WarmThumbnailsTest(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_warm_thumbnails(self):
+        author = User.objects.create_user(username=AUTHOR)
+        post = Post.objects.create(
+            author=author,
+            text=POST_TEXT,
+            image=SimpleUploadedFile(
+                name=NAME_FILE,
+                content=GIF,
+                content_type='image/gif'
+            ),
+        )
+        out = StringIO()
+        call_command('warm_thumbnails', workers=2, stdout=out)
+        self.assertIn('Миниатюры готовы: 1', out.getvalue())
+        generated = {
+            os.path.relpath(os.path.join(path, name), TEMP_MEDIA_ROOT)
+            for path, _, names in os.walk(TEMP_MEDIA_ROOT)
+            for name in names
+        }
+        for geometry, options in settings.THUMBNAIL_GEOMETRIES:
+            with self.subTest(geometry=geometry):
+                thumbnail = get_thumbnail(post.image, geometry, **options)
+                self.assertIn(thumbnail.name, generated)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=AUTHOR)
+        cls.not_author = User.objects.create_user(username=NOT_AUTHOR)
+        Group.objects.create(title='Группа', slug=GROUP_SLUG)
+        Follow.objects.create(user=cls.not_author, author=cls.author)
+        cls.source_dir = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        with open(os.path.join(cls.source_dir, NAME_FILE), 'wb') as file:
+            file.write(GIF)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.source_dir, ignore_errors=True)
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.source_dir, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def test_import_jsonl(self):
+        rows = [
+            {
+                'text': POST_TEXT,
+                'author': AUTHOR,
+                'group': GROUP_SLUG,
+                'created': '2020-01-02T03:04:05+00:00',
+                'image': NAME_FILE,
+            },
+            {'text': POST_TEXT, 'author': 'unknown'},
+            {'text': '', 'author': AUTHOR},
+            [POST_TEXT, AUTHOR],
+            {'text': 123, 'author': AUTHOR},
+            *(
+                {'text': f'{POST_TEXT} {i}', 'author': AUTHOR}
+                for i in range(3)
+            ),
+        ]
+        path = self.write(
+            'posts.jsonl',
+            '\n'.join(json.dumps(row) for row in rows) + '\n{broken\n'
+        )
+        Profile.objects.filter(user=self.not_author).update(posts_count=7)
+        out, err = StringIO(), StringIO()
+        with run_on_commit():
+            call_command(
+                'import_posts',
+                path,
+                batch_size=2,
+                images_dir=self.source_dir,
+                stdout=out,
+                stderr=err,
+            )
+        self.assertIn('Импортировано постов: 4', out.getvalue())
+        self.assertIn('пропущено строк: 5', out.getvalue())
+        self.assertEqual(len(err.getvalue().splitlines()), 5)
+        post = Post.objects.get(group__slug=GROUP_SLUG)
+        self.assertEqual(post.created.year, 2020)
+        self.assertTrue(post.image.name.startswith('posts/'))
+        self.assertTrue(os.path.exists(post.image.path))
+        for geometry, options in settings.THUMBNAIL_GEOMETRIES:
+            with self.subTest(geometry=geometry):
+                name = thumbnail_name(post.image.name, geometry, **options)
+                self.assertTrue(
+                    os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name))
+                )
+        self.assertEqual(
+            Profile.objects.get(user=self.author).posts_count,
+            4
+        )
+        self.assertEqual(self.not_author.timeline.count(), 4)
+        self.assertEqual(
+            Profile.objects.get(user=self.not_author).posts_count,
+            7
+        )
+
+    def test_import_finishes_after_error(self):
+        path = self.write(
+            'posts.jsonl',
+            '\n'.join(
+                json.dumps({'text': f'{POST_TEXT} {i}', 'author': AUTHOR})
+                for i in range(3)
+            )
+        )
+        flush = PostImporter.flush
+        batches = []
+
+        def failing_flush(importer, batch):
+            batches.append(batch)
+            if len(batches) > 1:
+                raise RuntimeError
+            flush(importer, batch)
+
+        with mock.patch.object(PostImporter, 'flush', failing_flush):
+            with self.assertRaises(RuntimeError):
+                call_command('import_posts', path, batch_size=2)
+        self.assertEqual(
+            Profile.objects.get(user=self.author).posts_count,
+            2
+        )
+        self.assertEqual(self.not_author.timeline.count(), 2)
+
+    def test_import_csv_creates_missing(self):
+        path = self.write(
+            'posts.csv',
+            'text,author,group\n'
+            f'{POST_TEXT},new_author,new-group\n'
+            f'{POST_TEXT},{AUTHOR},\n'
+        )
+        call_command(
+            'import_posts',
+            path,
+            create_missing=True,
+            stdout=StringIO(),
+        )
+        self.assertEqual(
+            Post.objects.filter(
+                author__username='new_author',
+                group__slug='new-group'
+            ).count(),
+            1
+        )
+        self.assertEqual(Post.objects.filter(author=self.author).count(), 1)
+
+
+class ExportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=AUTHOR)
+        cls.group = Group.objects.create(title='Группа', slug=GROUP_SLUG)
+        for i in range(3):
+            post = Post.objects.create(
+                author=cls.author,
+                group=cls.group,
+                text=f'{POST_TEXT} {i}',
+            )
+        Comment.objects.create(author=cls.author, post=post, text=POST_TEXT)
+        Post.objects.create(author=cls.author, text=POST_TEXT)
+
+    def test_export_round_trip(self):
+        out = StringIO()
+        call_command(
+            'export_posts',
+            group=GROUP_SLUG,
+            chunk_size=2,
+            stdout=out
+        )
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [row['type'] for row in rows],
+            ['post', 'post', 'post', 'comment']
+        )
+        source_dir = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, source_dir, ignore_errors=True)
+        path = os.path.join(source_dir, 'export.csv')
+        call_command('export_posts', author=AUTHOR, format='csv', output=path)
+        call_command('import_posts', path, stdout=StringIO())
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 6)
+        self.assertEqual(Post.objects.count(), 8)
+
+
+class BenchmarkTest(TestCase):
+    def test_benchmark_report(self):
+        out = StringIO()
+        call_command(
+            'benchmark',
+            users=10,
+            groups=2,
+            posts=40,
+            comments=20,
+            follows=2,
+            requests=2,
+            seed=1,
+            templates=True,
+            context=True,
+            sessions=True,
+            use_current_db=True,
+            stdout=out,
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['dataset']['posts'], 40)
+        self.assertEqual(Post.objects.count(), 40)
+        for name, result in report['results'].items():
+            with self.subTest(url=name):
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+                self.assertGreaterEqual(result['queries_per_request'], 0)
+                self.assertGreater(result['requests_per_second'], 0)
+        self.assertEqual(
+            report['templates']['cached'].keys(),
+            report['templates']['uncached'].keys()
+        )
+        for result in report['templates']['cached'].values():
+            self.assertGreater(result['template_p50_ms'], 0)
+        for result in report['context'].values():
+            self.assertGreater(result['chrome_us'], result['processors_us'])
+        sessions = report['sessions']
+        for name, result in sessions['cached'].items():
+            with self.subTest(session_page=name):
+                self.assertLess(
+                    result['queries_per_request'],
+                    sessions['db'][name]['queries_per_request']
+                )
+
+
+class TemplateWarmupTest(TestCase):
+    def test_warm_templates(self):
+        options = dict(
+            settings.TEMPLATES[0]['OPTIONS'],
+            loaders=[(
+                'django.template.loaders.cached.Loader',
+                ['django.template.loaders.filesystem.Loader'],
+            )]
+        )
+        with override_settings(
+            TEMPLATES=[dict(settings.TEMPLATES[0], OPTIONS=options)]
+        ):
+            engine = engines['django'].engine
+            names = list(template_names(engine))
+            self.assertIn('posts/index.html', names)
+            self.assertEqual(warm_templates(), len(names))
+            cached = engine.template_loaders[0].get_template_cache
+            for name in names:
+                with self.subTest(template=name):
+                    self.assertIn(name, cached)
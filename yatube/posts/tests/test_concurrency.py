@@ -0,0 +1,190 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, Profile, User
+
+AUTHOR = 'auth'
+COMMENT_TEXT = 'Комментарий'
+HOLD_TIMEOUT = 5
+POST_TEXT = 'Тестовая пост'
+READER = 'reader'
+READERS = 4
+ROUNDS = 5
+
+
+def in_own_connection(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        try:
+            return function(*args, **kwargs)
+        finally:
+            connection.close()
+    return wrapper
+
+
+class SQLiteConcurrencyTest(TransactionTestCase):
+    """Новые соединения в потоках открываются к файловой базе: тестовая
+    база в памяти не поддерживает WAL. Соединение основного потока
+    остаётся на базе в памяти."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        cls.test_settings = connections.databases['default']
+        connections.databases['default'] = dict(
+            cls.test_settings,
+            NAME=os.path.join(cls.directory, 'db.sqlite3')
+        )
+        cls.pool = ThreadPoolExecutor(max_workers=READERS + 2)
+        cls.post_id = cls.run_in_thread(cls.create_data)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        connections.databases['default'] = cls.test_settings
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def run_in_thread(cls, function, *args):
+        return cls.pool.submit(in_own_connection(function), *args).result()
+
+    @staticmethod
+    def create_data():
+        call_command('migrate', verbosity=0)
+        author = User.objects.create_user(username=AUTHOR)
+        User.objects.create_user(username=READER)
+        return Post.objects.create(author=author, text=POST_TEXT).pk
+
+    @staticmethod
+    def pragma(name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self):
+        pragmas = (('journal_mode', 'wal'), ('busy_timeout', 5000))
+        for pragma, value in pragmas:
+            with self.subTest(pragma=pragma):
+                self.assertEqual(
+                    self.run_in_thread(self.pragma, pragma),
+                    value
+                )
+
+    def test_readers_are_not_blocked_by_writers(self):
+        locked = threading.Event()
+        release = threading.Event()
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:post_detail', args=(self.post_id,)),
+        )
+
+        def hold_write_lock():
+            author = User.objects.get(username=AUTHOR)
+            with connection.cursor() as cursor:
+                # Без WAL такая блокировка не пускает и читателей.
+                cursor.execute('BEGIN EXCLUSIVE')
+                try:
+                    Comment.objects.create(
+                        post_id=self.post_id,
+                        author=author,
+                        text=COMMENT_TEXT,
+                    )
+                    locked.set()
+                    release.wait(HOLD_TIMEOUT)
+                finally:
+                    cursor.execute('COMMIT')
+
+        def read(url):
+            started = time.perf_counter()
+            response = Client().get(url)
+            return response.status_code, time.perf_counter() - started
+
+        def write():
+            client = Client()
+            client.force_login(User.objects.get(username=READER))
+            return client.post(
+                reverse('posts:add_comment', args=(self.post_id,)),
+                {'text': COMMENT_TEXT}
+            ).status_code
+
+        holder = self.pool.submit(in_own_connection(hold_write_lock))
+        self.assertTrue(locked.wait(HOLD_TIMEOUT))
+        readers = [
+            self.pool.submit(in_own_connection(read), url)
+            for url in urls * (READERS // len(urls))
+        ]
+        writer = self.pool.submit(in_own_connection(write))
+        reads = [reader.result() for reader in readers]
+        self.assertFalse(writer.done())
+        release.set()
+        holder.result()
+        self.assertEqual(writer.result(), 302)
+        for status, elapsed in reads:
+            self.assertEqual(status, 200)
+            self.assertLess(elapsed, HOLD_TIMEOUT)
+        self.assertEqual(self.run_in_thread(Comment.objects.count), 2)
+
+    def test_follow_unfollow_are_idempotent(self):
+        urls = {
+            name: reverse(f'posts:{name}', args=(AUTHOR,))
+            for name in ('profile_follow', 'profile_unfollow')
+        }
+
+        def login():
+            client = Client()
+            client.force_login(User.objects.get(username=READER))
+            return client
+
+        def hammer(name):
+            client = login()
+            return [
+                client.get(urls[name]).status_code for _ in range(ROUNDS)
+            ]
+
+        def follow_state():
+            profiles = dict(
+                Profile.objects.filter(
+                    user__username__in=(AUTHOR, READER)
+                ).values_list('user__username', 'followers_count')
+            )
+            reader = Profile.objects.get(user__username=READER)
+            return (
+                Follow.objects.filter(
+                    user__username=READER,
+                    author__username=AUTHOR
+                ).count(),
+                profiles[AUTHOR],
+                reader.following_count,
+            )
+
+        for final in ('profile_follow', 'profile_unfollow'):
+            with self.subTest(final=final):
+                names = ['profile_follow', 'profile_unfollow'] * READERS
+                statuses = [
+                    self.pool.submit(in_own_connection(hammer), name)
+                    for name in names[:READERS + 2]
+                ]
+                for future in statuses:
+                    self.assertEqual(set(future.result()), {302})
+                self.run_in_thread(
+                    lambda: login().get(urls[final]).status_code
+                )
+                follows, followers, following = self.run_in_thread(
+                    follow_state
+                )
+                expected = int(final == 'profile_follow')
+                self.assertEqual(follows, expected)
+                self.assertEqual(followers, expected)
+                self.assertEqual(following, expected)
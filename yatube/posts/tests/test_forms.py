@@ -1,15 +1,22 @@
+import os
 import shutil
 import tempfile
+from io import BytesIO
 
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, override_settings, TestCase
+from django.test import (
+    Client, override_settings, TestCase, TransactionTestCase
+)
 from django.urls import reverse
+from PIL import Image
 
+from posts import thumbnails
 from posts.forms import PostForm
 from posts.models import Post, Group, User
 
 AUTHOR = 'auth'
+EXIF_ORIENTATION = 0x0112
 GIF = (
     b'\x47\x49\x46\x38\x39\x61\x01\x00'
     b'\x01\x00\x00\x00\x00\x21\xf9\x04'
@@ -114,3 +121,91 @@ class PostCreateFormTests(TestCase):
                 image=POST_IMAGE,
             ).latest('pk')
         )
+
+    @override_settings(IMAGE_MAX_SIZE=(100, 100))
+    def test_image_is_normalized(self):
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = 6
+        content = BytesIO()
+        Image.new('RGB', (300, 200), 'red').save(
+            content,
+            'JPEG',
+            exif=exif.tobytes()
+        )
+        self.authorized_client.post(
+            REVERSE_POST_CREATE,
+            data={
+                'text': POST_TEXT,
+                'image': SimpleUploadedFile(
+                    name='photo.jpeg',
+                    content=content.getvalue(),
+                    content_type='image/jpeg'
+                ),
+            },
+        )
+        post = Post.objects.latest('pk')
+        self.assertEqual(post.image.name, 'posts/photo.jpg')
+        with Image.open(post.image) as image:
+            self.assertEqual(image.size, (67, 100))
+            self.assertNotIn('exif', image.info)
+            self.assertTrue(image.info.get('progressive'))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailScheduleTests(TransactionTestCase):
+    """Миниатюры строятся в on_commit, поэтому транзакции здесь
+    коммитятся по-настоящему."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.author = User.objects.create_user(username=AUTHOR)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def upload(self, url, name):
+        self.authorized_client.post(
+            url,
+            data={
+                'text': POST_TEXT,
+                'image': SimpleUploadedFile(
+                    name=name,
+                    content=GIF,
+                    content_type='image/gif'
+                ),
+            },
+        )
+        return Post.objects.latest('updated')
+
+    def assertThumbnailsExist(self, image_name):
+        for geometry, options in settings.THUMBNAIL_GEOMETRIES:
+            with self.subTest(image=image_name, geometry=geometry):
+                name = thumbnails.thumbnail_name(
+                    image_name,
+                    geometry,
+                    **options
+                )
+                self.assertTrue(
+                    os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name))
+                )
+
+    def test_thumbnails_on_create_and_edit(self):
+        post = self.upload(REVERSE_POST_CREATE, 'create.gif')
+        self.assertThumbnailsExist(post.image.name)
+        post = self.upload(
+            reverse('posts:post_edit', args=(post.pk,)),
+            'edit.gif'
+        )
+        self.assertEqual(post.image.name, 'posts/edit.gif')
+        self.assertThumbnailsExist(post.image.name)
+
+    @override_settings(THUMBNAIL_WORKERS=1)
+    def test_thumbnails_in_worker(self):
+        self.addCleanup(setattr, thumbnails, '_executor', None)
+        post = self.upload(REVERSE_POST_CREATE, 'worker.gif')
+        executor = thumbnails.get_executor()
+        executor.shutdown(wait=True)
+        self.assertThumbnailsExist(post.image.name)
@@ -1,6 +1,6 @@
 from django.test import TestCase
 
-from posts.models import Comment, Follow, Group, Post, User
+from posts.models import Comment, Follow, Group, Post, Profile, User
 
 AUTHOR = 'auth'
 COMMENT_TEXT = 'Комментарий'
@@ -49,3 +49,48 @@ class PostModelTest(TestCase):
         for model, object in model_object.items():
             with self.subTest(model=model):
                 self.assertEqual(object, str(model))
+
+
+class CounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=AUTHOR)
+        cls.not_author = User.objects.create_user(username=NOT_AUTHOR)
+
+    def test_counters_follow_changes(self):
+        post = Post.objects.create(author=self.author, text=POST_TEXT)
+        comment = Comment.objects.create(
+            author=self.not_author,
+            text=COMMENT_TEXT,
+            post=post
+        )
+        follow = Follow.objects.create(
+            user=self.not_author,
+            author=self.author
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(
+            Profile.objects.values_list(
+                'user__username',
+                'posts_count',
+                'followers_count',
+                'following_count'
+            ).order_by('user__username')[::1],
+            [(AUTHOR, 1, 1, 0), (NOT_AUTHOR, 0, 0, 1)]
+        )
+
+        comment.delete()
+        follow.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        post.delete()
+        self.assertEqual(
+            Profile.objects.values_list(
+                'posts_count',
+                'followers_count',
+                'following_count'
+            )[::1],
+            [(0, 0, 0), (0, 0, 0)]
+        )
@@ -0,0 +1,84 @@
+import re
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from posts.models import Comment, Group, Post, TimelineEntry, User
+from posts.paginators import CursorPaginator
+from yatube.settings import POSTS_ON_PAGE
+
+AUTHOR = 'auth'
+GROUP_DESCRIPTION = 'Тестовое описание'
+GROUP_SLUG = 'test-slug'
+GROUP_TITLE = 'Тестовая группа'
+# SQLite до 3.36 пишет в плане «SCAN TABLE posts_post», новее — «SCAN
+# posts_post».
+FULL_SCAN = r'SCAN (TABLE )?{}\b'
+INDEX_SCAN = 'USING INDEX'
+COVERING_INDEX_SCAN = 'USING COVERING INDEX'
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=AUTHOR)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION,
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text=GROUP_TITLE,
+            group=cls.group,
+        )
+
+    def get_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexed(self, queryset):
+        plan = self.get_plan(queryset)
+        for step in plan:
+            self.assertNotIn(TEMP_SORT, step, plan)
+            for table in (Post, Comment, TimelineEntry):
+                full_scan = FULL_SCAN.format(re.escape(table._meta.db_table))
+                if re.match(full_scan, step):
+                    self.assertTrue(
+                        INDEX_SCAN in step or COVERING_INDEX_SCAN in step,
+                        plan
+                    )
+
+    def test_view_querysets_use_indexes(self):
+        querysets = {
+            'index': Post.objects.for_listing(),
+            'group_posts': self.group.groups.for_listing(),
+            'profile': self.author.posts.for_listing(),
+            'follow_index': self.author.timeline.select_related(
+                'post__author',
+                'post__group'
+            ),
+            'post_detail': Comment.objects.filter(
+                post=self.post
+            ).order_by('created', 'id'),
+        }
+        for view, queryset in querysets.items():
+            paginator = CursorPaginator(queryset, POSTS_ON_PAGE)
+            keyset_values = [timezone.now(), self.post.pk]
+            pages = {
+                'page': queryset[:POSTS_ON_PAGE],
+                'next cursor': queryset.filter(
+                    paginator._after(keyset_values, True)
+                )[:POSTS_ON_PAGE],
+                'previous cursor': queryset.filter(
+                    paginator._after(keyset_values, False)
+                ).reverse()[:POSTS_ON_PAGE],
+            }
+            for page, page_queryset in pages.items():
+                with self.subTest(view=view, page=page):
+                    self.assertIndexed(page_queryset)
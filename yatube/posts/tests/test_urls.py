@@ -17,6 +17,7 @@ TEMPLATE_GROUP = 'posts/group_list.html'
 TEMPLATE_POST_CREATE = 'posts/create_post.html'
 TEMPLATE_POST_DETAIL = 'posts/post_detail.html'
 TEMPLATE_PROFILE = 'posts/profile.html'
+TEMPLATE_SEARCH = 'posts/search.html'
 URL_INDEX = '/'
 URL_GROUP = URL_INDEX + 'group/' + GROUP_SLUG + '/'
 URL_NONEXISTENT = URL_INDEX + 'nonexisting_page'
@@ -24,7 +25,9 @@ URL_POST_CREATE = URL_INDEX + 'create/'
 URL_POST_DETAIL = URL_INDEX + 'posts/' + POST_ID + '/'
 URL_POST_EDIT = URL_POST_DETAIL + 'edit/'
 URL_PROFILE = URL_INDEX + 'profile/' + AUTHOR + '/'
+URL_PROFILE_EXPORT = URL_PROFILE + 'export/'
 URL_REDIRECT_TO_LOGIN = URL_INDEX + 'auth/login/?next='
+URL_SEARCH = URL_INDEX + 'search/?q=' + POST_TEXT
 
 
 class URLTests(TestCase):
@@ -63,6 +66,7 @@ class URLTests(TestCase):
             URL_GROUP: TEMPLATE_GROUP,
             URL_PROFILE: TEMPLATE_PROFILE,
             URL_POST_DETAIL: TEMPLATE_POST_DETAIL,
+            URL_SEARCH: TEMPLATE_SEARCH,
             URL_POST_EDIT: TEMPLATE_POST_CREATE,
             URL_POST_CREATE: TEMPLATE_POST_CREATE,
         }
@@ -75,6 +79,7 @@ class URLTests(TestCase):
         url_redirects_names = {
             URL_POST_EDIT: URL_REDIRECT_TO_LOGIN + URL_POST_EDIT,
             URL_POST_CREATE: URL_REDIRECT_TO_LOGIN + URL_POST_CREATE,
+            URL_PROFILE_EXPORT: URL_REDIRECT_TO_LOGIN + URL_PROFILE_EXPORT,
         }
         for url, redirect in url_redirects_names.items():
             with self.subTest(url=url):
@@ -82,17 +87,25 @@ class URLTests(TestCase):
                 self.assertRedirects(response, redirect)
 
     def test_url_redirect_not_author(self):
-        url = URL_POST_EDIT
-        redirect = URL_POST_DETAIL
-        response = self.authorized_not_author_client.get(url, follow=True)
-        self.assertRedirects(response, redirect)
+        url_redirects_names = {
+            URL_POST_EDIT: URL_POST_DETAIL,
+            URL_PROFILE_EXPORT: URL_PROFILE,
+        }
+        for url, redirect in url_redirects_names.items():
+            with self.subTest(url=url):
+                response = self.authorized_not_author_client.get(
+                    url,
+                    follow=True
+                )
+                self.assertRedirects(response, redirect)
 
     def test_url_anonymous(self):
         urls = (
             URL_INDEX,
             URL_GROUP,
             URL_PROFILE,
-            URL_POST_DETAIL
+            URL_POST_DETAIL,
+            URL_SEARCH,
         )
         for url in urls:
             with self.subTest(url=url):
@@ -107,6 +120,7 @@ class URLTests(TestCase):
             URL_POST_DETAIL,
             URL_POST_EDIT,
             URL_POST_CREATE,
+            URL_PROFILE_EXPORT,
         )
         for url in urls:
             with self.subTest(url=url):
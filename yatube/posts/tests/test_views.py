@@ -1,14 +1,29 @@
+import base64
+import datetime
+import json
 import shutil
 import tempfile
+from io import StringIO
+from unittest import mock
 
 from django import forms
 from django.conf import settings
 from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import connection, transaction
 from django.test import Client, override_settings, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from posts.models import Group, Post, User
+from core import metrics
+from core.templatetags.pagination import ELLIPSIS, elided_page_range
+from posts import following
+from posts.caching import INDEX_SCOPE, get_version, group_scope
+from posts.models import Comment, Group, Post, User
+from posts.tests.utils import run_on_commit
 from yatube.settings import POSTS_ON_PAGE
 
 AUTHOR = 'auth'
@@ -33,12 +48,16 @@ GROUP_ANOTHER_TITLE = 'Другая группа'
 NAME_FILE = 'small.gif'
 NOT_AUTHOR = 'not_author'
 NOT_AUTHORS_FOLLOWER = 'not_authors_follower'
+PASSWORD = 'пароль-для-теста'
 POST_IMAGE = 'posts/' + NAME_FILE
 POST_TEXT = 'Тестовая пост'
 POST_TEXT_FIRST = 'Тестовый пост другой группы'
 REVERSE_FOLLOW_INDEX = reverse('posts:follow_index')
 REVERSE_INDEX = reverse('posts:index')
+REVERSE_LOGIN = reverse('users:login')
+REVERSE_METRICS = reverse('core:metrics')
 REVERSE_POST_CREATE = reverse('posts:post_create')
+REVERSE_SEARCH = reverse('posts:search')
 TEMPLATES_INDEX = 'posts/index.html'
 TEMPLATES_GROUP = 'posts/group_list.html'
 TEMPLATES_POST_CREATE = 'posts/create_post.html'
@@ -138,6 +157,11 @@ class ViewTests(TestCase):
         )
         cache.clear()
 
+    @staticmethod
+    def follow(client, url):
+        with run_on_commit():
+            return client.get(url)
+
     def test_templates(self):
         pages_templates = {
             **self.pages_with_paginator,
@@ -184,6 +208,193 @@ class ViewTests(TestCase):
                     last_objects
                 )
 
+    def test_paginator_count_is_cached(self):
+        self.client.get(REVERSE_INDEX)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(REVERSE_INDEX + '?page=2')
+        self.assertFalse([
+            query for query in context.captured_queries
+            if 'COUNT(' in query['sql']
+        ])
+        with run_on_commit():
+            Post.objects.create(author=self.author, text=POST_TEXT)
+        response = self.client.get(REVERSE_INDEX)
+        self.assertEqual(
+            response.context[CONTEXT].paginator.count,
+            Post.objects.count()
+        )
+        with override_settings(PAGINATOR_APPROXIMATE_COUNT=1):
+            with run_on_commit():
+                Post.objects.create(author=self.author, text=POST_TEXT)
+            response = self.client.get(REVERSE_INDEX)
+        self.assertEqual(
+            response.context[CONTEXT].paginator.count,
+            Post.objects.count() - 1
+        )
+
+    def test_elided_page_range(self):
+        paginator = Paginator(range(200), POSTS_ON_PAGE)
+        self.assertEqual(
+            list(elided_page_range(paginator, 10)),
+            [1, ELLIPSIS, 8, 9, 10, 11, 12, ELLIPSIS, 20]
+        )
+        self.assertEqual(
+            list(elided_page_range(paginator, 2)),
+            [1, 2, 3, 4, ELLIPSIS, 20]
+        )
+        self.assertEqual(
+            list(elided_page_range(Paginator(range(30), POSTS_ON_PAGE), 1)),
+            [1, 2, 3]
+        )
+
+    def test_cursor_paginator(self):
+        for reverse_name in self.pages_with_paginator.keys():
+            with self.subTest(page=reverse_name):
+                response = self.client.get(reverse_name + '?cursor=')
+                first_page = response.context[CONTEXT]
+                self.assertEqual(len(first_page), POSTS_ON_PAGE)
+                self.assertFalse(first_page.has_previous())
+                response = self.client.get(
+                    reverse_name + '?cursor=' + first_page.next_cursor
+                )
+                second_page = response.context[CONTEXT]
+                if reverse_name == self.reverse_group:
+                    last_objects = 3
+                else:
+                    last_objects = 4
+                self.assertEqual(len(second_page), last_objects)
+                self.assertTrue(set(first_page).isdisjoint(second_page))
+                self.assertFalse(second_page.has_next())
+                response = self.client.get(
+                    reverse_name + '?cursor=' + second_page.previous_cursor
+                )
+                self.assertEqual(
+                    list(response.context[CONTEXT]),
+                    list(first_page)
+                )
+        cursors = (
+            [0, None, None],
+            [0, '2020-01-01T00:00:00+00:00', None],
+            [0, '2020-01-01T00:00:00+00:00', 99999999999999999999999],
+            [1, '2020-01-01T00:00:00+00:00', -99999999999999999999999],
+        )
+        pages = (
+            REVERSE_INDEX,
+            reverse('posts:api_index'),
+            self.post_detail,
+            reverse('posts:post_comments', args=(self.last_post.pk,)),
+        )
+        for data in cursors:
+            cursor = base64.urlsafe_b64encode(json.dumps(data).encode())
+            for reverse_name in pages:
+                with self.subTest(cursor=data, page=reverse_name):
+                    response = self.client.get(
+                        reverse_name,
+                        {'cursor': cursor.decode()}
+                    )
+                    self.assertEqual(response.status_code, 200)
+
+    def test_num_queries(self):
+        self.authorized_not_author_client.get(self.reverse_profile_follow)
+        for commentator in (self.author, self.not_author):
+            Comment.objects.create(
+                author=commentator,
+                post=self.last_post,
+                text=POST_TEXT,
+            )
+        pages_queries = {
+            REVERSE_INDEX: 2,
+            self.reverse_group: 4,
+            self.reverse_profile: 5,
+            self.post_detail: 3,
+            REVERSE_FOLLOW_INDEX: 2,
+        }
+        for reverse_name, queries in pages_queries.items():
+            with self.subTest(page=reverse_name):
+                with self.assertNumQueries(queries):
+                    self.authorized_not_author_client.get(reverse_name)
+
+    def test_comments_are_paginated(self):
+        Comment.objects.bulk_create(
+            Comment(author=self.not_author, post=self.last_post, text=str(i))
+            for i in range(settings.COMMENTS_ON_PAGE + 5)
+        )
+        reverse_comments = reverse(
+            'posts:post_comments',
+            kwargs={'post_id': self.last_post.id}
+        )
+        response = self.client.get(self.post_detail)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), settings.COMMENTS_ON_PAGE)
+        self.assertEqual(comments[0].text, '0')
+        self.assertContains(response, f'data-url="{reverse_comments}"')
+        self.assertContains(response, 'data-more')
+        response = self.client.get(self.post_detail, {'order': 'newest'})
+        self.assertEqual(
+            response.context['comments'][0].text,
+            str(settings.COMMENTS_ON_PAGE + 4)
+        )
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse_comments,
+                {'cursor': comments.next_cursor}
+            )
+        self.assertTemplateUsed(response, 'posts/includes/comments.html')
+        self.assertEqual(
+            [comment.text for comment in response.context['comments']],
+            [
+                str(i) for i in range(
+                    settings.COMMENTS_ON_PAGE,
+                    settings.COMMENTS_ON_PAGE + 5
+                )
+            ]
+        )
+        self.assertFalse(response.context['comments'].has_next())
+
+    def test_profile_export(self):
+        Comment.objects.create(
+            author=self.not_author,
+            post=self.last_post,
+            text=POST_TEXT,
+        )
+        reverse_export = reverse('posts:profile_export', args=(self.author,))
+        response = self.authorized_client.get(reverse_export)
+        self.assertTrue(response.streaming)
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            [row['type'] for row in rows].count('post'),
+            self.author.posts.count()
+        )
+        self.assertEqual(rows[-1]['type'], 'comment')
+        self.assertEqual(rows[-1]['post'], self.last_post.pk)
+        response = self.authorized_client.get(
+            reverse_export,
+            {'format': 'csv'}
+        )
+        content = b''.join(response.streaming_content).decode()
+        self.assertTrue(content.startswith('type,id,post,author'))
+
+    def test_search(self):
+        response = self.client.get(REVERSE_SEARCH, {'q': 'другой групп'})
+        self.assertEqual(list(response.context[CONTEXT]), [self.first_post])
+        response = self.client.get(REVERSE_SEARCH, {'q': POST_TEXT})
+        self.assertEqual(
+            response.context[CONTEXT].paginator.count,
+            Post.objects.filter(text__startswith=POST_TEXT).count()
+        )
+        Post.objects.filter(pk=self.last_post.pk).update(text=POST_TEXT_FIRST)
+        response = self.client.get(REVERSE_SEARCH, {'q': 'другой "группы'})
+        self.assertEqual(
+            set(response.context[CONTEXT]),
+            {self.first_post, self.last_post}
+        )
+        self.first_post.delete()
+        response = self.client.get(REVERSE_SEARCH, {'q': 'другой'})
+        self.assertEqual(list(response.context[CONTEXT]), [self.last_post])
+
     def test_context_without_paginator(self):
         for reverse_name in self.pages_without_paginator.keys():
             response = self.authorized_client.get(reverse_name)
@@ -199,6 +410,15 @@ class ViewTests(TestCase):
                     self.assertIsInstance(form_field, expected)
                     self.assertEqual(second_context, True)
 
+    def test_footer_year(self):
+        with mock.patch(
+            'core.context_processors.year.timezone.localdate',
+            return_value=datetime.date(2031, 1, 1)
+        ) as localdate:
+            response = self.client.get(REVERSE_INDEX)
+        self.assertContains(response, '© 2031 Copyright')
+        localdate.assert_called_once_with()
+
     def test_post_with_another_group(self):
         reverse_name = self.reverse_anouther_group
         response = self.authorized_client.get(reverse_name)
@@ -209,13 +429,275 @@ class ViewTests(TestCase):
         self.assertEqual(post_image_0, POST_IMAGE)
 
     def test_cache(self):
-        response_before_delete = self.client.get(REVERSE_INDEX)
-        Post.objects.latest('pk').delete()
-        response_after_delete = self.client.get(REVERSE_INDEX)
+        response_before_update = self.client.get(REVERSE_INDEX)
+        Post.objects.filter(pk=self.last_post.pk).update(text=POST_TEXT_FIRST)
+        response_after_update = self.client.get(REVERSE_INDEX)
+        self.assertEqual(
+            response_before_update.content,
+            response_after_update.content
+        )
+        response_second_page = self.client.get(REVERSE_INDEX + '?page=2')
+        self.assertNotEqual(
+            response_before_update.content,
+            response_second_page.content
+        )
+
+    def test_cache_stampede_serves_stale_fragment(self):
+        response_before_create = self.client.get(REVERSE_INDEX)
+        lock_key = make_template_fragment_key('index_page', ['', '']) + '.lock'
+        cache.set(lock_key, True)
+        with run_on_commit():
+            Post.objects.create(author=self.author, text=POST_TEXT_FIRST)
+        response_while_locked = self.client.get(REVERSE_INDEX)
         self.assertEqual(
-            response_before_delete.content,
-            response_after_delete.content
+            response_before_create.content,
+            response_while_locked.content
+        )
+        cache.delete(lock_key)
+        response_after_unlock = self.client.get(REVERSE_INDEX)
+        self.assertNotEqual(
+            response_before_create.content,
+            response_after_unlock.content
+        )
+
+    def test_cache_invalidation(self):
+        pages = (
+            REVERSE_INDEX,
+            self.reverse_group,
+            self.reverse_profile,
+        )
+        for reverse_name in pages:
+            with self.subTest(page=reverse_name):
+                response_before_delete = self.client.get(reverse_name)
+                with run_on_commit():
+                    Post.objects.latest('pk').delete()
+                response_after_delete = self.client.get(reverse_name)
+                self.assertNotEqual(
+                    response_before_delete.content,
+                    response_after_delete.content
+                )
+
+    def test_versions_are_bumped_after_commit(self):
+        before = get_version(INDEX_SCOPE)
+        with run_on_commit():
+            with transaction.atomic():
+                Post.objects.latest('pk').delete()
+                uncommitted = get_version(INDEX_SCOPE)
+        self.assertNotIn(get_version(INDEX_SCOPE), (before, uncommitted))
+
+    def test_group_change_bumps_only_its_scope(self):
+        group = Group.objects.get(pk=self.group.pk)
+        scope = group_scope(group.pk)
+        index, group_version = get_version(INDEX_SCOPE), get_version(scope)
+        group.title = GROUP_ANOTHER_TITLE
+        group.save()
+        self.assertEqual(get_version(INDEX_SCOPE), index)
+        self.assertNotEqual(get_version(scope), group_version)
+        group.slug = 'new-slug'
+        group.save()
+        self.assertNotEqual(get_version(INDEX_SCOPE), index)
+
+    def test_anonymous_page_cache(self):
+        pages = (
+            REVERSE_INDEX,
+            self.reverse_group,
+            self.reverse_profile,
+            self.post_detail,
+        )
+        first = {url: self.client.get(url) for url in pages}
+        for url in pages:
+            with self.subTest(page=url):
+                response = self.client.get(url)
+                self.assertIsNone(response.context)
+                self.assertEqual(response.content, first[url].content)
+        with self.assertNumQueries(0):
+            self.client.get(REVERSE_INDEX)
+        response = self.authorized_client.get(REVERSE_INDEX)
+        self.assertIsNotNone(response.context)
+        with run_on_commit():
+            Comment.objects.create(
+                author=self.author,
+                post=self.last_post,
+                text=POST_TEXT_FIRST,
+            )
+        self.assertIsNotNone(self.client.get(self.post_detail).context)
+        self.assertIsNone(self.client.get(REVERSE_INDEX).context)
+
+    def test_request_metrics(self):
+        metrics.histogram.clear()
+        response = self.authorized_client.get(REVERSE_INDEX)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('misses=1', response['Server-Timing'])
+        response = self.authorized_client.get(REVERSE_INDEX)
+        self.assertIn('hits=1', response['Server-Timing'])
+        self.assertRedirects(
+            self.authorized_client.get(REVERSE_METRICS),
+            reverse('admin:login') + '?next=' + REVERSE_METRICS
+        )
+        self.author.is_staff = True
+        self.author.save()
+        snapshot = self.authorized_client.get(REVERSE_METRICS).json()
+        self.assertEqual(snapshot['posts:index']['requests'], 2)
+        self.assertEqual(snapshot['posts:index']['cache_hits'], 1)
+
+    def test_not_modified(self):
+        pages = (
+            REVERSE_INDEX,
+            self.reverse_group,
+            self.reverse_profile,
+            self.post_detail,
         )
+        etags = {}
+        for reverse_name in pages:
+            with self.subTest(page=reverse_name):
+                response = self.authorized_client.get(reverse_name)
+                etags[reverse_name] = response['ETag']
+                response = self.authorized_client.get(
+                    reverse_name,
+                    HTTP_IF_NONE_MATCH=etags[reverse_name]
+                )
+                self.assertEqual(response.status_code, 304)
+                response = self.authorized_not_author_client.get(
+                    reverse_name,
+                    HTTP_IF_NONE_MATCH=etags[reverse_name]
+                )
+                self.assertEqual(response.status_code, 200)
+        with run_on_commit():
+            Comment.objects.create(
+                author=self.not_author,
+                post=self.last_post,
+                text=POST_TEXT,
+            )
+            self.last_post.text = POST_TEXT_FIRST
+            self.last_post.save()
+        for reverse_name, etag in etags.items():
+            with self.subTest(page=reverse_name):
+                response = self.authorized_client.get(
+                    reverse_name,
+                    HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_not_modified_after_csrf_rotation(self):
+        user = User.objects.get(pk=self.not_author.pk)
+        user.set_password(PASSWORD)
+        user.save()
+        credentials = {'username': NOT_AUTHOR, 'password': PASSWORD}
+        client = Client()
+        client.post(REVERSE_LOGIN, credentials)
+        client.get(self.post_detail)
+        etag = client.get(self.post_detail)['ETag']
+        response = client.get(self.post_detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        client.logout()
+        client.post(REVERSE_LOGIN, credentials)
+        response = client.get(self.post_detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_last_modified_moves_on_delete_and_follow(self):
+        client = self.authorized_not_author_client
+        changes = {
+            'delete': (
+                (
+                    REVERSE_INDEX,
+                    self.reverse_anouther_group,
+                    self.reverse_profile,
+                ),
+                lambda: Post.objects.get(pk=self.first_post.pk).delete(),
+            ),
+            'follow': (
+                (self.reverse_profile,),
+                lambda: self.follow(client, self.reverse_profile_follow),
+            ),
+        }
+        later = 0
+        for change, (pages, make_change) in changes.items():
+            last_modified = {
+                page: client.get(page)['Last-Modified'] for page in pages
+            }
+            later = max(later, datetime.datetime.now().timestamp()) + 1
+            with mock.patch('posts.caching.time.time', return_value=later):
+                with run_on_commit():
+                    make_change()
+            for page in pages:
+                with self.subTest(change=change, page=page):
+                    response = client.get(
+                        page,
+                        HTTP_IF_MODIFIED_SINCE=last_modified[page]
+                    )
+                    self.assertEqual(response.status_code, 200)
+
+    @override_settings(TIMELINE_LENGTH=POSTS_ON_PAGE)
+    def test_follow_timeline_is_trimmed(self):
+        self.authorized_not_author_client.get(self.reverse_profile_follow)
+        self.assertEqual(self.not_author.timeline.count(), POSTS_ON_PAGE)
+        new_post = Post.objects.create(
+            author=self.author,
+            text=POST_TEXT_FIRST,
+        )
+        self.assertEqual(self.not_author.timeline.count(), POSTS_ON_PAGE + 1)
+        call_command('trim_timelines', stdout=StringIO())
+        self.assertEqual(self.not_author.timeline.count(), POSTS_ON_PAGE)
+        response = self.authorized_not_author_client.get(REVERSE_FOLLOW_INDEX)
+        self.assertEqual(response.context[CONTEXT][0], new_post)
+        self.assertFalse(response.context[CONTEXT].has_other_pages())
+
+    def test_session_user_is_cached(self):
+        client = self.authorized_not_author_client
+        client.get(REVERSE_FOLLOW_INDEX)
+        with CaptureQueriesContext(connection) as context:
+            client.get(REVERSE_FOLLOW_INDEX)
+        for query in context.captured_queries:
+            self.assertNotIn('"django_session"', query['sql'])
+            self.assertNotIn('FROM "auth_user" WHERE', query['sql'])
+        user = User.objects.get(pk=self.not_author.pk)
+        user.first_name = 'Новое имя'
+        user.save()
+        response = client.get(REVERSE_FOLLOW_INDEX)
+        self.assertContains(response, 'Пользователь: Новое имя')
+        user.set_password('новый-пароль')
+        user.save()
+        response = client.get(REVERSE_FOLLOW_INDEX)
+        self.assertRedirects(
+            response,
+            f'{reverse("users:login")}?next={REVERSE_FOLLOW_INDEX}'
+        )
+
+    def test_model_backend_session_stays_logged_in(self):
+        client = Client()
+        client.force_login(
+            self.not_author,
+            backend='django.contrib.auth.backends.ModelBackend'
+        )
+        response = client.get(REVERSE_FOLLOW_INDEX)
+        self.assertEqual(response.status_code, 200)
+
+    def test_following_state_is_cached(self):
+        client = self.authorized_not_author_client
+        response = client.get(self.reverse_profile)
+        self.assertFalse(response.context['following'])
+        self.follow(client, self.reverse_profile_follow)
+        response = client.get(self.reverse_profile)
+        self.assertTrue(response.context['following'])
+        with CaptureQueriesContext(connection) as context:
+            client.get(self.reverse_profile)
+        for query in context.captured_queries:
+            self.assertNotIn('"posts_follow"', query['sql'])
+        self.follow(client, self.reverse_profile_unfollow)
+        response = client.get(self.reverse_profile)
+        self.assertFalse(response.context['following'])
+
+    def test_following_cache_is_reset_after_commit(self):
+        key = following.FOLLOWING_KEY.format(self.not_author.pk)
+        following.following_ids(User.objects.get(pk=self.not_author.pk))
+        with run_on_commit():
+            with transaction.atomic():
+                following.follow(self.not_author.pk, self.author.pk)
+                self.assertEqual(cache.get(key), frozenset())
+            self.assertEqual(cache.get(key), frozenset())
+        self.assertIsNone(cache.get(key))
+        user = User.objects.get(pk=self.not_author.pk)
+        self.assertTrue(following.is_following(user, self.author.pk))
 
     def test_subscribe_unsubscribe(self):
         follower = self.not_author.follower
@@ -0,0 +1,16 @@
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def run_on_commit():
+    """TestCase не коммитит транзакцию, а в Django 2.2 нет
+    captureOnCommitCallbacks: колбэки on_commit из блока выполняются
+    здесь."""
+    start = len(connection.run_on_commit)
+    yield
+    callbacks = connection.run_on_commit[start:]
+    del connection.run_on_commit[start:]
+    for _, callback in callbacks:
+        callback()
@@ -0,0 +1,74 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails'
+        )
+    return _executor
+
+
+def thumbnail_name(image_name, geometry, **options):
+    """Имя файла миниатюры, которое дал бы get_thumbnail, но без
+    обращения к kvstore: миниатюры заранее строит schedule_thumbnails."""
+    backend = default.backend
+    source = ImageFile(image_name)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    return backend._get_thumbnail_filename(source, geometry, options)
+
+
+def thumbnail_url(image_name):
+    """Адрес первой миниатюры или None, пока её файл ещё не создан."""
+    geometry, options = settings.THUMBNAIL_GEOMETRIES[0]
+    name = thumbnail_name(image_name, geometry, **options)
+    if not default.storage.exists(name):
+        return None
+    return default.storage.url(name)
+
+
+def make_thumbnails(image_name):
+    try:
+        for geometry, options in settings.THUMBNAIL_GEOMETRIES:
+            get_thumbnail(image_name, geometry, **options)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры для %s', image_name)
+        return False
+    return True
+
+
+def make_thumbnails_in_worker(image_name):
+    try:
+        return make_thumbnails(image_name)
+    finally:
+        connections.close_all()
+
+
+def schedule_thumbnails(image_name):
+    if not settings.THUMBNAIL_WORKERS:
+        transaction.on_commit(lambda: make_thumbnails(image_name))
+        return
+    transaction.on_commit(
+        lambda: get_executor().submit(make_thumbnails_in_worker, image_name)
+    )
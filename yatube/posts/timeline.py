@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Follow, Post, TimelineEntry
+
+
+def trim_timeline(user_id):
+    """Удаляет из ленты записи старше TIMELINE_LENGTH самых новых.
+
+    Граница ищется по индексу (user, created), так что читается не
+    больше TIMELINE_LENGTH + 1 записей одного пользователя.
+    """
+    entries = TimelineEntry.objects.filter(user_id=user_id)
+    length = settings.TIMELINE_LENGTH
+    boundary = list(entries.values_list('created', 'id')[length:length + 1])
+    if not boundary:
+        return 0
+    created, entry_id = boundary[0]
+    deleted, _ = entries.filter(
+        Q(created__lt=created) | Q(created=created, id__lte=entry_id)
+    ).delete()
+    return deleted
+
+
+def trim_timelines():
+    user_ids = TimelineEntry.objects.order_by().values_list(
+        'user_id',
+        flat=True
+    ).distinct()
+    return sum(trim_timeline(user_id) for user_id in list(user_ids))
+
+
+def fan_out(post):
+    """Добавляет пост в ленты подписчиков. Ленты здесь не обрезаются:
+    это стоило бы O(подписчики × TIMELINE_LENGTH) на каждый пост, поэтому
+    лишние записи удаляет команда trim_timelines."""
+    follower_ids = list(
+        Follow.objects.filter(
+            author_id=post.author_id
+        ).values_list('user_id', flat=True)
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post=post, created=post.created)
+            for user_id in follower_ids
+        ],
+        batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill(user_id, author_id):
+    posts = Post.objects.filter(
+        author_id=author_id
+    ).values_list('id', 'created')[:settings.TIMELINE_LENGTH]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post_id=post_id, created=created)
+            for post_id, created in posts
+        ],
+        batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    trim_timeline(user_id)
+
+
+def remove_author(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id,
+        post__author_id=author_id
+    ).delete()
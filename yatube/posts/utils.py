@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.paginator import Paginator
+
+from .paginators import CachedCountPaginator, CursorPaginator
+from yatube.settings import POSTS_ON_PAGE
+
+CURSOR_PARAM = 'cursor'
+ORDER_PARAM = 'order'
+PAGE_PARAM = 'page'
+COMMENT_ORDERINGS = {
+    'oldest': ('created', 'pk'),
+    'newest': ('-created', '-pk'),
+}
+
+
+def paginate(request, post_list, cursor=True, version=None):
+    if cursor and CURSOR_PARAM in request.GET:
+        paginator = CursorPaginator(post_list, POSTS_ON_PAGE)
+        return paginator.get_page(request.GET.get(CURSOR_PARAM))
+    if version is None:
+        paginator = Paginator(post_list, POSTS_ON_PAGE)
+    else:
+        paginator = CachedCountPaginator(post_list, POSTS_ON_PAGE, version)
+    return paginator.get_page(request.GET.get(PAGE_PARAM))
+
+
+def paginate_comments(request, comment_list):
+    order = request.GET.get(ORDER_PARAM)
+    if order not in COMMENT_ORDERINGS:
+        order = next(iter(COMMENT_ORDERINGS))
+    paginator = CursorPaginator(
+        comment_list.select_related('author'),
+        settings.COMMENTS_ON_PAGE,
+        ordering=COMMENT_ORDERINGS[order]
+    )
+    return paginator.get_page(request.GET.get(CURSOR_PARAM)), order
+
+
+@contextmanager
+def keep_created(*models):
+    fields = [model._meta.get_field('created') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
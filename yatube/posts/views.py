@@ -1,74 +1,129 @@
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import ObjectDoesNotExist
-from django.core.paginator import Paginator
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from .caching import INDEX_SCOPE, get_version, group_scope, profile_scope
+from .conditional import (
+    anonymous_page_cache, conditional_page, group_state, index_state,
+    post_state, profile_state
+)
+from .exporter import CONTENT_TYPES, stream_export
+from .following import follow, is_following, unfollow
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
-from yatube.settings import POSTS_ON_PAGE
+from .models import Group, Post, User
+from .search import search_posts
+from .thumbnails import schedule_thumbnails
+from .utils import paginate, paginate_comments
 
 
+@conditional_page(index_state)
+@anonymous_page_cache(index_state)
 def index(request):
     template = 'posts/index.html'
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, POSTS_ON_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.for_listing()
+    cache_version = get_version(INDEX_SCOPE)
+    page_obj = paginate(request, post_list, version=cache_version)
     context = {
         'page_obj': page_obj,
+        'cache_version': cache_version,
     }
     return render(request, template, context)
 
 
+@conditional_page(group_state)
+@anonymous_page_cache(group_state)
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.groups.all()
-    paginator = Paginator(post_list, POSTS_ON_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = group.groups.for_listing()
+    cache_version = get_version(group_scope(group.pk))
+    page_obj = paginate(request, post_list, version=cache_version)
     context = {
         'group': group,
         'page_obj': page_obj,
+        'cache_version': cache_version,
     }
     return render(request, template, context)
 
 
+@conditional_page(profile_state)
+@anonymous_page_cache(profile_state)
 def profile(request, username):
     template = 'posts/profile.html'
-    username = get_object_or_404(User, username=username)
-    post_list = username.posts.all()
-    paginator = Paginator(post_list, POSTS_ON_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    following = True
-    if request.user.is_authenticated:
-        follower = request.user.follower.all()
-        try:
-            follower.get(user=request.user, author=username)
-        except ObjectDoesNotExist:
-            following = False
+    username = get_object_or_404(
+        User.objects.select_related('profile'),
+        username=username
+    )
+    post_list = username.posts.for_listing()
+    cache_version = get_version(profile_scope(username.pk))
+    page_obj = paginate(request, post_list, version=cache_version)
     context = {
         'username': username,
         'page_obj': page_obj,
-        'following': following,
+        'following': is_following(request.user, username.pk),
+        'cache_version': cache_version,
     }
     return render(request, template, context)
 
 
+@login_required
+def profile_export(request, username):
+    if request.user.username != username:
+        return redirect('posts:profile', username=username)
+    file_format = request.GET.get('format')
+    if file_format not in CONTENT_TYPES:
+        file_format = 'jsonl'
+    response = StreamingHttpResponse(
+        stream_export(request.user.posts.all(), file_format),
+        content_type=CONTENT_TYPES[file_format]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{username}.{file_format}"'
+    )
+    return response
+
+
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    post_list = search_posts(Post.objects.for_listing(), query)
+    page_obj = paginate(request, post_list, cursor=False)
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
+@conditional_page(post_state)
+@anonymous_page_cache(post_state)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    page_obj = get_object_or_404(Post, id=post_id)
-    comments = page_obj.comments.all()
+    page_obj = get_object_or_404(Post.objects.for_detail(), id=post_id)
+    comments, comments_order = paginate_comments(request, page_obj.comments)
     form = CommentForm(request.POST or None)
     context = {
         'page_obj': page_obj,
         'comments': comments,
+        'comments_order': comments_order,
         'form': form,
     }
     return render(request, template, context)
 
 
+@conditional_page(post_state)
+@anonymous_page_cache(post_state)
+def post_comments(request, post_id):
+    template = 'posts/includes/comments.html'
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    comments, comments_order = paginate_comments(request, post.comments)
+    context = {
+        'comments': comments,
+        'comments_order': comments_order,
+    }
+    return render(request, template, context)
+
+
 @login_required
 def post_create(request):
     template = 'posts/create_post.html'
@@ -82,6 +137,8 @@ def post_create(request):
             form = form.save(commit=False)
             form.author_id = author.id
             form.save()
+            if form.image:
+                schedule_thumbnails(form.image.name)
             return redirect('posts:profile', username=author)
 
     return render(request, template, {'form': form})
@@ -100,7 +157,9 @@ def post_edit(request, post_id):
         return redirect('posts:post_detail', post_id=post_id)
     if request.method == 'POST':
         if form.is_valid():
-            form.save()
+            post = form.save()
+            if 'image' in form.changed_data and post.image:
+                schedule_thumbnails(post.image.name)
             return redirect('posts:post_detail', post_id=post_id)
         return render(request, template, {'form': form})
 
@@ -128,14 +187,12 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
-    username = get_object_or_404(User, username=request.user)
-    followers = []
-    for follower in username.follower.all():
-        followers.append(follower.author)
-    post_list = Post.objects.filter(author__in=followers)
-    paginator = Paginator(post_list, POSTS_ON_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    entries = request.user.timeline.select_related(
+        'post__author',
+        'post__group'
+    )
+    page_obj = paginate(request, entries)
+    page_obj.object_list = [entry.post for entry in page_obj]
     context = {
         'page_obj': page_obj,
     }
@@ -145,27 +202,12 @@ def follow_index(request):
 @login_required
 def profile_follow(request, username):
     username = get_object_or_404(User, username=username)
-    follower = request.user.follower.all()
-    try:
-        follower.get(user=request.user, author=username)
-    except ObjectDoesNotExist:
-        if request.user != username:
-            follow = Follow()
-            follow.user = request.user
-            follow.author = username
-            follow.save()
+    follow(request.user.pk, username.pk)
     return redirect('posts:follow_index')
 
 
 @login_required
 def profile_unfollow(request, username):
     username = get_object_or_404(User, username=username)
-    try:
-        following = request.user.follower.get(
-            user=request.user,
-            author=username
-        )
-        following.delete()
-    except ObjectDoesNotExist:
-        pass
+    unfollow(request.user.pk, username.pk)
     return redirect('posts:follow_index')
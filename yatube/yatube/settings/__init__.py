@@ -0,0 +1,12 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENVIRONMENT = os.environ.get('DJANGO_ENV', 'dev')
+
+if ENVIRONMENT == 'prod':
+    from .prod import *  # noqa: F401, F403
+elif ENVIRONMENT == 'dev':
+    from .dev import *  # noqa: F401, F403
+else:
+    raise ImproperlyConfigured(f'Неизвестное окружение DJANGO_ENV={ENVIRONMENT}')
@@ -1,8 +1,10 @@
 import os
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
 SECRET_KEY = '4z3hf_6fra2j&w1d@fuc@ct3(hgtg=14zb34_xw@=_+=q)at3w'
-DEBUG = True
+DEBUG = False
 ALLOWED_HOSTS = [
     'localhost',
     '127.0.0.1',
@@ -24,6 +26,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -36,14 +39,19 @@ MIDDLEWARE = [
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+TEMPLATE_WARMUP = False
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'NAME': 'django',
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
-                'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
@@ -62,6 +70,14 @@ DATABASES = {
     }
 }
 
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.'
@@ -86,6 +102,14 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 
+AUTHENTICATION_BACKENDS = [
+    'core.auth_backends.CachedModelBackend',
+    # Загружает сессии, созданные до CachedModelBackend.
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CACHE_TIMEOUT = 60 * 60
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
@@ -104,3 +128,28 @@ CACHES = {
 }
 
 POSTS_ON_PAGE = 10
+COMMENTS_ON_PAGE = 20
+PAGINATOR_COUNT_TIMEOUT = 60 * 60 * 6
+PAGINATOR_APPROXIMATE_COUNT = 10000
+PAGINATOR_APPROXIMATE_TIMEOUT = 60
+
+THUMBNAIL_GEOMETRIES = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+THUMBNAIL_WORKERS = 0
+
+IMAGE_MAX_SIZE = (1920, 1920)
+IMAGE_JPEG_QUALITY = 85
+IMAGE_REENCODE_SIZE = 512 * 1024
+
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 6
+FRAGMENT_CACHE_LOCK_TIMEOUT = 10
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+TIMELINE_LENGTH = 1000
+TIMELINE_BATCH_SIZE = 500
+FOLLOWING_CACHE_TIMEOUT = 60 * 60 * 24
+
+EXPORT_CHUNK_SIZE = 500
+
+REQUEST_METRICS_WINDOW = 1000
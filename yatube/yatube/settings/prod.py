@@ -0,0 +1,74 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401, F403
+from .base import BASE_DIR, TEMPLATES
+
+DEBUG = False
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Для DJANGO_ENV=prod задайте DJANGO_SECRET_KEY')
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS',
+    'localhost,127.0.0.1,[::1]'
+).split(',')
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'DJANGO_DB_NAME',
+            os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 600)),
+    }
+}
+
+# Файловый кэш общий для всех воркеров, но каждый set() перечисляет
+# весь каталог, поэтому записей немного. add() и incr() в нём не
+# атомарны между процессами: блокировка от cache stampede и повышение
+# версий могут изредка сработать дважды или потерять инкремент. Если
+# это важно, нужен бэкенд с атомарными add() и incr(), например memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'DJANGO_CACHE_DIR',
+            os.path.join(BASE_DIR, 'cache')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': 3000,
+        },
+    }
+}
+
+SESSION_ENGINE = os.environ.get(
+    'DJANGO_SESSION_ENGINE',
+    'django.contrib.sessions.backends.cached_db'
+)
+
+TEMPLATE_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES = [dict(
+    TEMPLATES[0],
+    OPTIONS=dict(TEMPLATES[0]['OPTIONS'], loaders=TEMPLATE_LOADERS)
+)]
+TEMPLATE_WARMUP = True
+
+THUMBNAIL_WORKERS = 2
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'loggers': {
+        'django.db.backends': {
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}